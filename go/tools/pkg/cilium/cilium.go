@@ -2,13 +2,20 @@ package cilium
 
 import (
 	"context"
+	"errors"
 	"fmt"
 	"strings"
+	"sync"
+	"time"
 
+	"github.com/kagent-dev/kagent/go/tools/pkg/logger"
 	"github.com/kagent-dev/kagent/go/tools/pkg/utils"
 
 	"github.com/mark3labs/mcp-go/mcp"
 	"github.com/mark3labs/mcp-go/server"
+	k8serrors "k8s.io/apimachinery/pkg/api/errors"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+	"k8s.io/client-go/kubernetes"
 )
 
 func runCiliumCliWithContext(ctx context.Context, args ...string) (string, error) {
@@ -337,34 +344,226 @@ func getCiliumPodName(nodeName string) (string, error) {
 	return getCiliumPodNameWithContext(context.Background(), nodeName)
 }
 
+// ciliumPodNameTTL bounds how long a resolved cilium pod name is reused before it is looked up again
+const ciliumPodNameTTL = 5 * time.Minute
+
+type cachedCiliumPodName struct {
+	podName   string
+	expiresAt time.Time
+}
+
+var (
+	ciliumPodNamesMu sync.Mutex
+	ciliumPodNames   = map[string]cachedCiliumPodName{}
+)
+
 func getCiliumPodNameWithContext(ctx context.Context, nodeName string) (string, error) {
+	ciliumPodNamesMu.Lock()
+	cached, ok := ciliumPodNames[nodeName]
+	ciliumPodNamesMu.Unlock()
+	if ok && time.Now().Before(cached.expiresAt) {
+		return cached.podName, nil
+	}
+
+	var podName string
+	var err error
+	if clientset := getKubeClientset(ctx); clientset != nil {
+		podName, err = lookupCiliumPodName(ctx, clientset, nodeName)
+	} else {
+		podName, err = lookupCiliumPodNameWithKubectl(ctx, nodeName)
+	}
+	if err != nil {
+		return "", err
+	}
+
+	ciliumPodNamesMu.Lock()
+	ciliumPodNames[nodeName] = cachedCiliumPodName{podName: podName, expiresAt: time.Now().Add(ciliumPodNameTTL)}
+	ciliumPodNamesMu.Unlock()
+	return podName, nil
+}
+
+// lookupCiliumPodName lists cilium pods through the API server and returns the first one in
+// the "pod/<name>" form kubectl exec accepts
+func lookupCiliumPodName(ctx context.Context, clientset kubernetes.Interface, nodeName string) (string, error) {
+	listOptions := metav1.ListOptions{LabelSelector: "k8s-app=cilium"}
+	if nodeName != "" {
+		listOptions.FieldSelector = "spec.nodeName=" + nodeName
+	}
+	pods, err := clientset.CoreV1().Pods("kube-system").List(ctx, listOptions)
+	if err != nil {
+		return "", fmt.Errorf("failed to get cilium pod name: %v", err)
+	}
+	if len(pods.Items) == 0 {
+		return "", fmt.Errorf("no cilium pod found")
+	}
+	return "pod/" + pods.Items[0].Name, nil
+}
+
+func lookupCiliumPodNameWithKubectl(ctx context.Context, nodeName string) (string, error) {
 	args := []string{"get", "pod", "-l", "k8s-app=cilium", "-o", "name", "-n", "kube-system"}
 	if nodeName != "" {
 		args = append(args, "--field-selector", "spec.nodeName="+nodeName)
 	}
-	podName, err := utils.RunCommandWithContext(ctx, "kubectl", args)
+	output, err := utils.RunCommandWithContext(ctx, "kubectl", args)
 	if err != nil {
 		return "", fmt.Errorf("failed to get cilium pod name: %v", err)
 	}
-	if podName == "" {
+	// Without a node name every cilium pod is listed, any of them will do
+	pods := strings.Fields(output)
+	if len(pods) == 0 {
 		return "", fmt.Errorf("no cilium pod found")
 	}
-	return strings.TrimSpace(podName), nil
+	return pods[0], nil
+}
+
+// invalidateCiliumPodName forgets the cached pod for the node, e.g. after an exec into it failed
+func invalidateCiliumPodName(nodeName string) {
+	ciliumPodNamesMu.Lock()
+	delete(ciliumPodNames, nodeName)
+	ciliumPodNamesMu.Unlock()
+}
+
+// Argument lists for cilium-dbg commands that take no parameters, shared across calls and never modified
+var (
+	endpointListArgs    = []string{"endpoint", "list"}
+	identityListArgs    = []string{"identity", "list"}
+	debugInfoArgs       = []string{"debuginfo"}
+	encryptStatusArgs   = []string{"encrypt", "status"}
+	encryptFlushArgs    = []string{"encrypt", "flush", "-f"}
+	dnsNamesArgs        = []string{"dns", "names"}
+	ipListArgs          = []string{"ip", "list"}
+	loadInfoArgs        = []string{"loadinfo"}
+	lrpListArgs         = []string{"lrp", "list"}
+	bpfMapListArgs      = []string{"bpf", "map", "list"}
+	nodesListArgs       = []string{"nodes", "list"}
+	nodeIDListArgs      = []string{"nodeid", "list"}
+	policySelectorsArgs = []string{"policy", "selectors"}
+	prefilterListArgs   = []string{"prefilter", "list"}
+	recorderListArgs    = []string{"recorder", "list"}
+)
+
+func runCiliumDbgCommandWithContext(ctx context.Context, args []string, nodeName string) (string, error) {
+	results, err := runCiliumDbgCommandsWithContext(ctx, [][]string{args}, nodeName)
+	if err != nil {
+		return "", err
+	}
+	return results[0].output, results[0].err
+}
+
+// runCiliumDbgCommandsWithContext runs several cilium-dbg commands against the node's cilium pod
+// in a single round-trip through its exec session and returns one result per command.
+func runCiliumDbgCommandsWithContext(ctx context.Context, commands [][]string, nodeName string) ([]ciliumDbgResult, error) {
+	results, err := runCiliumDbgCommandsOnce(ctx, commands, nodeName)
+	if err != nil {
+		return nil, err
+	}
+
+	// A read-only command cut off by a session that went stale (e.g. an idle exec stream
+	// that was closed) is retried once on a fresh session
+	var retry []int
+	for i, result := range results {
+		if errors.Is(result.err, errCiliumDbgSessionClosed) && isReadOnlyCiliumDbgCommand(commands[i]) {
+			retry = append(retry, i)
+		}
+	}
+	if len(retry) == 0 {
+		return results, nil
+	}
+	retryCommands := make([][]string, len(retry))
+	for j, i := range retry {
+		retryCommands[j] = commands[i]
+	}
+	retried, err := runCiliumDbgCommandsOnce(ctx, retryCommands, nodeName)
+	if err != nil {
+		return results, nil
+	}
+	for j, i := range retry {
+		results[i] = retried[j]
+	}
+	return results, nil
 }
 
-func runCiliumDbgCommand(command, nodeName string) (string, error) {
-	return runCiliumDbgCommandWithContext(context.Background(), command, nodeName)
+func runCiliumDbgCommandsOnce(ctx context.Context, commands [][]string, nodeName string) ([]ciliumDbgResult, error) {
+	session, err := getCiliumDbgSession(ctx, nodeName)
+	if err != nil {
+		if !errors.Is(err, errCiliumDbgNothingSent) {
+			return nil, err
+		}
+		logger.Get().Info("cilium-dbg session unavailable, falling back to kubectl exec", "error", err.Error())
+		return execCiliumDbgCommands(ctx, commands, nodeName), nil
+	}
+	results, err := session.runAll(ctx, commands)
+	if err == nil || !errors.Is(err, errCiliumDbgSessionClosed) {
+		return results, err
+	}
+
+	// The session broke (e.g. the pod was restarted), re-resolve the pod; the next
+	// call starts a fresh session.
+	dropCiliumDbgSession(nodeName, session)
+	invalidateCiliumPodName(nodeName)
+	if !errors.Is(err, errCiliumDbgNothingSent) {
+		// Some commands may already have run, re-running them could apply a change twice
+		return results, nil
+	}
+
+	// Nothing reached the pod, fall back to one-off execs
+	logger.Get().Info("cilium-dbg session failed, falling back to kubectl exec", "error", err.Error())
+	return execCiliumDbgCommands(ctx, commands, nodeName), nil
+}
+
+// ciliumDbgReadOnlyVerbs are the cilium-dbg subcommands that only inspect state
+var ciliumDbgReadOnlyVerbs = map[string]bool{
+	"list": true, "get": true, "status": true, "logs": true, "health": true, "names": true,
+	"events": true, "selectors": true, "debuginfo": true, "loadinfo": true,
+}
+
+// isReadOnlyCiliumDbgCommand reports whether running the command again cannot change anything,
+// judged by the verb among its leading words (e.g. "bpf map list", "endpoint get 12")
+func isReadOnlyCiliumDbgCommand(args []string) bool {
+	for i, arg := range args {
+		if i == 3 || strings.HasPrefix(arg, "-") {
+			break
+		}
+		if ciliumDbgReadOnlyVerbs[arg] {
+			return true
+		}
+	}
+	return false
 }
 
-func runCiliumDbgCommandWithContext(ctx context.Context, command, nodeName string) (string, error) {
+// execCiliumDbgCommands runs each command with its own kubectl exec
+func execCiliumDbgCommands(ctx context.Context, commands [][]string, nodeName string) []ciliumDbgResult {
+	results := make([]ciliumDbgResult, len(commands))
+	for i, cmdParts := range commands {
+		output, err := execCiliumDbgCommand(ctx, cmdParts, nodeName)
+		results[i] = ciliumDbgResult{output: output, err: err}
+	}
+	return results
+}
+
+func execCiliumDbgCommand(ctx context.Context, cmdParts []string, nodeName string) (string, error) {
 	podName, err := getCiliumPodNameWithContext(ctx, nodeName)
 	if err != nil {
 		return "", err
 	}
-	cmdParts := strings.Fields(command)
-	args := []string{"exec", "-it", podName, "-n", "kube-system", "--", "cilium-dbg"}
+	args := []string{"exec", podName, "-n", "kube-system", "--", "cilium-dbg"}
 	args = append(args, cmdParts...)
-	return utils.RunCommandWithContext(ctx, "kubectl", args)
+	output, err := utils.RunCommandWithContext(ctx, "kubectl", args)
+	if err != nil && ciliumPodGone(ctx, podName) {
+		invalidateCiliumPodName(nodeName)
+	}
+	return output, err
+}
+
+// ciliumPodGone reports whether the cilium pod no longer exists. A failed exec only drops the
+// cached pod name when the pod went away, not when cilium-dbg itself exited non-zero.
+func ciliumPodGone(ctx context.Context, podName string) bool {
+	if clientset := getKubeClientset(ctx); clientset != nil {
+		_, err := clientset.CoreV1().Pods("kube-system").Get(ctx, strings.TrimPrefix(podName, "pod/"), metav1.GetOptions{})
+		return k8serrors.IsNotFound(err)
+	}
+	output, err := utils.RunCommandWithContext(ctx, "kubectl", []string{"get", podName, "-n", "kube-system", "-o", "name", "--ignore-not-found"})
+	return err == nil && output == ""
 }
 
 func handleGetEndpointDetails(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
@@ -373,16 +572,20 @@ func handleGetEndpointDetails(ctx context.Context, request mcp.CallToolRequest)
 	outputFormat := mcp.ParseString(request, "output_format", "json")
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	var cmd []string
 	if labels != "" {
-		cmd = fmt.Sprintf("endpoint get -l %s -o %s", labels, outputFormat)
+		cmd = []string{"endpoint", "get"}
+		for _, label := range strings.Fields(labels) {
+			cmd = append(cmd, "-l", label)
+		}
+		cmd = append(cmd, "-o", outputFormat)
 	} else if endpointID != "" {
-		cmd = fmt.Sprintf("endpoint get %s -o %s", endpointID, outputFormat)
+		cmd = []string{"endpoint", "get", endpointID, "-o", outputFormat}
 	} else {
 		return mcp.NewToolResultError("either endpoint_id or labels must be provided"), nil
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get endpoint details: %v", err)), nil
 	}
@@ -397,8 +600,7 @@ func handleGetEndpointLogs(ctx context.Context, request mcp.CallToolRequest) (*m
 		return mcp.NewToolResultError("endpoint_id parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("endpoint logs %s", endpointID)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"endpoint", "logs", endpointID}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get endpoint logs: %v", err)), nil
 	}
@@ -413,8 +615,7 @@ func handleGetEndpointHealth(ctx context.Context, request mcp.CallToolRequest) (
 		return mcp.NewToolResultError("endpoint_id parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("endpoint health %s", endpointID)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"endpoint", "health", endpointID}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get endpoint health: %v", err)), nil
 	}
@@ -431,8 +632,11 @@ func handleManageEndpointLabels(ctx context.Context, request mcp.CallToolRequest
 		return mcp.NewToolResultError("endpoint_id and labels parameters are required"), nil
 	}
 
-	cmd := fmt.Sprintf("endpoint labels %s --%s %s", endpointID, action, labels)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	cmd := []string{"endpoint", "labels", endpointID}
+	for _, label := range strings.Fields(labels) {
+		cmd = append(cmd, "--"+action, label)
+	}
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to manage endpoint labels: %v", err)), nil
 	}
@@ -451,8 +655,8 @@ func handleManageEndpointConfiguration(ctx context.Context, request mcp.CallTool
 		return mcp.NewToolResultError("config parameter is required"), nil
 	}
 
-	command := fmt.Sprintf("endpoint config %s %s", endpointID, config)
-	output, err := runCiliumDbgCommand(command, nodeName)
+	command := append([]string{"endpoint", "config", endpointID}, strings.Fields(config)...)
+	output, err := runCiliumDbgCommandWithContext(ctx, command, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError("Error managing endpoint configuration: " + err.Error()), nil
 	}
@@ -468,8 +672,7 @@ func handleDisconnectEndpoint(ctx context.Context, request mcp.CallToolRequest)
 		return mcp.NewToolResultError("endpoint_id parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("endpoint disconnect %s", endpointID)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"endpoint", "disconnect", endpointID}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to disconnect endpoint: %v", err)), nil
 	}
@@ -479,7 +682,7 @@ func handleDisconnectEndpoint(ctx context.Context, request mcp.CallToolRequest)
 func handleGetEndpointsList(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("endpoint list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, endpointListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get endpoints list: %v", err)), nil
 	}
@@ -489,7 +692,7 @@ func handleGetEndpointsList(ctx context.Context, request mcp.CallToolRequest) (*
 func handleListIdentities(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("identity list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, identityListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list identities: %v", err)), nil
 	}
@@ -504,8 +707,7 @@ func handleGetIdentityDetails(ctx context.Context, request mcp.CallToolRequest)
 		return mcp.NewToolResultError("identity_id parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("identity get %s", identityID)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"identity", "get", identityID}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get identity details: %v", err)), nil
 	}
@@ -518,18 +720,16 @@ func handleShowConfigurationOptions(ctx context.Context, request mcp.CallToolReq
 	listOptions := mcp.ParseString(request, "list_options", "") == "true"
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	cmd := []string{"endpoint", "config"}
 	if listAll {
-		cmd = "endpoint config --all"
+		cmd = append(cmd, "--all")
 	} else if listReadOnly {
-		cmd = "endpoint config -r"
+		cmd = append(cmd, "-r")
 	} else if listOptions {
-		cmd = "endpoint config --list-options"
-	} else {
-		cmd = "endpoint config"
+		cmd = append(cmd, "--list-options")
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to show configuration options: %v", err)), nil
 	}
@@ -550,8 +750,8 @@ func handleToggleConfigurationOption(ctx context.Context, request mcp.CallToolRe
 		valueStr = "disable"
 	}
 
-	cmd := fmt.Sprintf("endpoint config %s=%s", option, valueStr)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	cmd := []string{"endpoint", "config", option + "=" + valueStr}
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to toggle configuration option: %v", err)), nil
 	}
@@ -561,7 +761,7 @@ func handleToggleConfigurationOption(ctx context.Context, request mcp.CallToolRe
 func handleRequestDebuggingInformation(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("debuginfo", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, debugInfoArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to request debugging information: %v", err)), nil
 	}
@@ -571,7 +771,7 @@ func handleRequestDebuggingInformation(ctx context.Context, request mcp.CallTool
 func handleDisplayEncryptionState(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("encrypt status", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, encryptStatusArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to display encryption state: %v", err)), nil
 	}
@@ -581,7 +781,7 @@ func handleDisplayEncryptionState(ctx context.Context, request mcp.CallToolReque
 func handleFlushIPsecState(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("encrypt flush -f", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, encryptFlushArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to flush IPsec state: %v", err)), nil
 	}
@@ -596,8 +796,7 @@ func handleListEnvoyConfig(ctx context.Context, request mcp.CallToolRequest) (*m
 		return mcp.NewToolResultError("resource_name parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("envoy admin %s", resourceName)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"envoy", "admin", resourceName}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list Envoy config: %v", err)), nil
 	}
@@ -608,14 +807,12 @@ func handleFQDNCache(ctx context.Context, request mcp.CallToolRequest) (*mcp.Cal
 	command := mcp.ParseString(request, "command", "list")
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	cmd := []string{"fqdn", "cache", command}
 	if command == "clean" {
-		cmd = "fqdn cache clean -f"
-	} else {
-		cmd = fmt.Sprintf("fqdn cache %s", command)
+		cmd = append(cmd, "-f")
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to manage FQDN cache: %v", err)), nil
 	}
@@ -625,7 +822,7 @@ func handleFQDNCache(ctx context.Context, request mcp.CallToolRequest) (*mcp.Cal
 func handleShowDNSNames(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("dns names", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, dnsNamesArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to show DNS names: %v", err)), nil
 	}
@@ -635,7 +832,7 @@ func handleShowDNSNames(ctx context.Context, request mcp.CallToolRequest) (*mcp.
 func handleListIPAddresses(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("ip list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, ipListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list IP addresses: %v", err)), nil
 	}
@@ -647,16 +844,19 @@ func handleShowIPCacheInformation(ctx context.Context, request mcp.CallToolReque
 	labels := mcp.ParseString(request, "labels", "")
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	var cmd []string
 	if labels != "" {
-		cmd = fmt.Sprintf("ip get --labels %s", labels)
+		cmd = []string{"ip", "get"}
+		for _, label := range strings.Fields(labels) {
+			cmd = append(cmd, "--labels", label)
+		}
 	} else if cidr != "" {
-		cmd = fmt.Sprintf("ip get %s", cidr)
+		cmd = []string{"ip", "get", cidr}
 	} else {
 		return mcp.NewToolResultError("either cidr or labels must be provided"), nil
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to show IP cache information: %v", err)), nil
 	}
@@ -671,8 +871,7 @@ func handleDeleteKeyFromKVStore(ctx context.Context, request mcp.CallToolRequest
 		return mcp.NewToolResultError("key parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("kvstore delete %s", key)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"kvstore", "delete", key}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to delete key from kvstore: %v", err)), nil
 	}
@@ -687,8 +886,7 @@ func handleGetKVStoreKey(ctx context.Context, request mcp.CallToolRequest) (*mcp
 		return mcp.NewToolResultError("key parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("kvstore get %s", key)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"kvstore", "get", key}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get key from kvstore: %v", err)), nil
 	}
@@ -704,8 +902,8 @@ func handleSetKVStoreKey(ctx context.Context, request mcp.CallToolRequest) (*mcp
 		return mcp.NewToolResultError("key and value parameters are required"), nil
 	}
 
-	cmd := fmt.Sprintf("kvstore set %s=%s", key, value)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	cmd := []string{"kvstore", "set", key + "=" + value}
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to set key in kvstore: %v", err)), nil
 	}
@@ -715,7 +913,7 @@ func handleSetKVStoreKey(ctx context.Context, request mcp.CallToolRequest) (*mcp
 func handleShowLoadInformation(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("loadinfo", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, loadInfoArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to show load information: %v", err)), nil
 	}
@@ -725,7 +923,7 @@ func handleShowLoadInformation(ctx context.Context, request mcp.CallToolRequest)
 func handleListLocalRedirectPolicies(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("lrp list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, lrpListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list local redirect policies: %v", err)), nil
 	}
@@ -740,8 +938,7 @@ func handleListBPFMapEvents(ctx context.Context, request mcp.CallToolRequest) (*
 		return mcp.NewToolResultError("map_name parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("bpf map events %s", mapName)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"bpf", "map", "events", mapName}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list BPF map events: %v", err)), nil
 	}
@@ -756,8 +953,7 @@ func handleGetBPFMap(ctx context.Context, request mcp.CallToolRequest) (*mcp.Cal
 		return mcp.NewToolResultError("map_name parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("bpf map get %s", mapName)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"bpf", "map", "get", mapName}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get BPF map: %v", err)), nil
 	}
@@ -767,7 +963,7 @@ func handleGetBPFMap(ctx context.Context, request mcp.CallToolRequest) (*mcp.Cal
 func handleListBPFMaps(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("bpf map list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, bpfMapListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list BPF maps: %v", err)), nil
 	}
@@ -778,14 +974,12 @@ func handleListMetrics(ctx context.Context, request mcp.CallToolRequest) (*mcp.C
 	matchPattern := mcp.ParseString(request, "match_pattern", "")
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	cmd := []string{"metrics", "list"}
 	if matchPattern != "" {
-		cmd = fmt.Sprintf("metrics list --pattern %s", matchPattern)
-	} else {
-		cmd = "metrics list"
+		cmd = append(cmd, "--pattern", matchPattern)
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list metrics: %v", err)), nil
 	}
@@ -795,7 +989,7 @@ func handleListMetrics(ctx context.Context, request mcp.CallToolRequest) (*mcp.C
 func handleListClusterNodes(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("nodes list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, nodesListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list cluster nodes: %v", err)), nil
 	}
@@ -805,7 +999,7 @@ func handleListClusterNodes(ctx context.Context, request mcp.CallToolRequest) (*
 func handleListNodeIds(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("nodeid list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, nodeIDListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list node IDs: %v", err)), nil
 	}
@@ -816,14 +1010,9 @@ func handleDisplayPolicyNodeInformation(ctx context.Context, request mcp.CallToo
 	labels := mcp.ParseString(request, "labels", "")
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
-	if labels != "" {
-		cmd = fmt.Sprintf("policy get %s", labels)
-	} else {
-		cmd = "policy get"
-	}
+	cmd := append([]string{"policy", "get"}, strings.Fields(labels)...)
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to display policy node information: %v", err)), nil
 	}
@@ -835,16 +1024,16 @@ func handleDeletePolicyRules(ctx context.Context, request mcp.CallToolRequest) (
 	all := mcp.ParseString(request, "all", "") == "true"
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	var cmd []string
 	if all {
-		cmd = "policy delete --all"
+		cmd = []string{"policy", "delete", "--all"}
 	} else if labels != "" {
-		cmd = fmt.Sprintf("policy delete %s", labels)
+		cmd = append([]string{"policy", "delete"}, strings.Fields(labels)...)
 	} else {
 		return mcp.NewToolResultError("either labels or all=true must be provided"), nil
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to delete policy rules: %v", err)), nil
 	}
@@ -854,7 +1043,7 @@ func handleDeletePolicyRules(ctx context.Context, request mcp.CallToolRequest) (
 func handleDisplaySelectors(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("policy selectors", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, policySelectorsArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to display selectors: %v", err)), nil
 	}
@@ -864,7 +1053,7 @@ func handleDisplaySelectors(ctx context.Context, request mcp.CallToolRequest) (*
 func handleListXDPCIDRFilters(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("prefilter list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, prefilterListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list XDP CIDR filters: %v", err)), nil
 	}
@@ -880,14 +1069,12 @@ func handleUpdateXDPCIDRFilters(ctx context.Context, request mcp.CallToolRequest
 		return mcp.NewToolResultError("cidr_prefixes parameter is required"), nil
 	}
 
-	var cmd string
+	cmd := []string{"prefilter", "update", "--cidr", cidrPrefixes}
 	if revision != "" {
-		cmd = fmt.Sprintf("prefilter update --cidr %s --revision %s", cidrPrefixes, revision)
-	} else {
-		cmd = fmt.Sprintf("prefilter update --cidr %s", cidrPrefixes)
+		cmd = append(cmd, "--revision", revision)
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to update XDP CIDR filters: %v", err)), nil
 	}
@@ -903,14 +1090,12 @@ func handleDeleteXDPCIDRFilters(ctx context.Context, request mcp.CallToolRequest
 		return mcp.NewToolResultError("cidr_prefixes parameter is required"), nil
 	}
 
-	var cmd string
+	cmd := []string{"prefilter", "delete", "--cidr", cidrPrefixes}
 	if revision != "" {
-		cmd = fmt.Sprintf("prefilter delete --cidr %s --revision %s", cidrPrefixes, revision)
-	} else {
-		cmd = fmt.Sprintf("prefilter delete --cidr %s", cidrPrefixes)
+		cmd = append(cmd, "--revision", revision)
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to delete XDP CIDR filters: %v", err)), nil
 	}
@@ -922,15 +1107,15 @@ func handleValidateCiliumNetworkPolicies(ctx context.Context, request mcp.CallTo
 	enableK8sAPIDiscovery := mcp.ParseString(request, "enable_k8s_api_discovery", "") == "true"
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	cmd := "preflight validate-cnp"
+	cmd := []string{"preflight", "validate-cnp"}
 	if enableK8s {
-		cmd += " --enable-k8s"
+		cmd = append(cmd, "--enable-k8s")
 	}
 	if enableK8sAPIDiscovery {
-		cmd += " --enable-k8s-api-discovery"
+		cmd = append(cmd, "--enable-k8s-api-discovery")
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to validate Cilium network policies: %v", err)), nil
 	}
@@ -940,7 +1125,7 @@ func handleValidateCiliumNetworkPolicies(ctx context.Context, request mcp.CallTo
 func handleListPCAPRecorders(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	output, err := runCiliumDbgCommand("recorder list", nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, recorderListArgs, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list PCAP recorders: %v", err)), nil
 	}
@@ -955,8 +1140,7 @@ func handleGetPCAPRecorder(ctx context.Context, request mcp.CallToolRequest) (*m
 		return mcp.NewToolResultError("recorder_id parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("recorder get %s", recorderID)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"recorder", "get", recorderID}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get PCAP recorder: %v", err)), nil
 	}
@@ -971,8 +1155,7 @@ func handleDeletePCAPRecorder(ctx context.Context, request mcp.CallToolRequest)
 		return mcp.NewToolResultError("recorder_id parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("recorder delete %s", recorderID)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"recorder", "delete", recorderID}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to delete PCAP recorder: %v", err)), nil
 	}
@@ -990,8 +1173,8 @@ func handleUpdatePCAPRecorder(ctx context.Context, request mcp.CallToolRequest)
 		return mcp.NewToolResultError("recorder_id and filters parameters are required"), nil
 	}
 
-	cmd := fmt.Sprintf("recorder update %s --filters %s --caplen %s --id %s", recorderID, filters, caplen, id)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	cmd := []string{"recorder", "update", recorderID, "--filters", filters, "--caplen", caplen, "--id", id}
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to update PCAP recorder: %v", err)), nil
 	}
@@ -1002,14 +1185,12 @@ func handleListServices(ctx context.Context, request mcp.CallToolRequest) (*mcp.
 	showClusterMeshAffinity := mcp.ParseString(request, "show_cluster_mesh_affinity", "") == "true"
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	cmd := []string{"service", "list"}
 	if showClusterMeshAffinity {
-		cmd = "service list --clustermesh-affinity"
-	} else {
-		cmd = "service list"
+		cmd = append(cmd, "--clustermesh-affinity")
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to list services: %v", err)), nil
 	}
@@ -1024,8 +1205,7 @@ func handleGetServiceInformation(ctx context.Context, request mcp.CallToolReques
 		return mcp.NewToolResultError("service_id parameter is required"), nil
 	}
 
-	cmd := fmt.Sprintf("service get %s", serviceID)
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, []string{"service", "get", serviceID}, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get service information: %v", err)), nil
 	}
@@ -1037,16 +1217,16 @@ func handleDeleteService(ctx context.Context, request mcp.CallToolRequest) (*mcp
 	all := mcp.ParseString(request, "all", "") == "true"
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	var cmd string
+	var cmd []string
 	if all {
-		cmd = "service delete --all"
+		cmd = []string{"service", "delete", "--all"}
 	} else if serviceID != "" {
-		cmd = fmt.Sprintf("service delete %s", serviceID)
+		cmd = []string{"service", "delete", serviceID}
 	} else {
 		return mcp.NewToolResultError("either service_id or all=true must be provided"), nil
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to delete service: %v", err)), nil
 	}
@@ -1074,38 +1254,37 @@ func handleUpdateService(ctx context.Context, request mcp.CallToolRequest) (*mcp
 		return mcp.NewToolResultError("backends, frontend, and id parameters are required"), nil
 	}
 
-	cmd := fmt.Sprintf("service update %s --backends %s --frontend %s --protocol %s --states %s",
-		id, backends, frontend, protocol, states)
+	cmd := []string{"service", "update", id, "--backends", backends, "--frontend", frontend, "--protocol", protocol, "--states", states}
 
 	if backendWeights != "" {
-		cmd += fmt.Sprintf(" --backend-weights %s", backendWeights)
+		cmd = append(cmd, "--backend-weights", backendWeights)
 	}
 	if k8sClusterInternal {
-		cmd += " --k8s-cluster-internal"
+		cmd = append(cmd, "--k8s-cluster-internal")
 	}
 	if k8sExtTrafficPolicy != "Cluster" {
-		cmd += fmt.Sprintf(" --k8s-ext-traffic-policy %s", k8sExtTrafficPolicy)
+		cmd = append(cmd, "--k8s-ext-traffic-policy", k8sExtTrafficPolicy)
 	}
 	if k8sExternal {
-		cmd += " --k8s-external"
+		cmd = append(cmd, "--k8s-external")
 	}
 	if k8sHostPort {
-		cmd += " --k8s-host-port"
+		cmd = append(cmd, "--k8s-host-port")
 	}
 	if k8sIntTrafficPolicy != "Cluster" {
-		cmd += fmt.Sprintf(" --k8s-int-traffic-policy %s", k8sIntTrafficPolicy)
+		cmd = append(cmd, "--k8s-int-traffic-policy", k8sIntTrafficPolicy)
 	}
 	if k8sLoadBalancer {
-		cmd += " --k8s-load-balancer"
+		cmd = append(cmd, "--k8s-load-balancer")
 	}
 	if k8sNodePort {
-		cmd += " --k8s-node-port"
+		cmd = append(cmd, "--k8s-node-port")
 	}
 	if localRedirect {
-		cmd += " --local-redirect"
+		cmd = append(cmd, "--local-redirect")
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to update service: %v", err)), nil
 	}
@@ -1122,36 +1301,70 @@ func handleGetDaemonStatus(ctx context.Context, request mcp.CallToolRequest) (*m
 	brief := mcp.ParseString(request, "brief", "") == "true"
 	nodeName := mcp.ParseString(request, "node_name", "")
 
-	cmd := "status"
+	cmd := []string{"status"}
 	if showAllAddresses {
-		cmd += " --all-addresses"
+		cmd = append(cmd, "--all-addresses")
 	}
 	if showAllClusters {
-		cmd += " --all-clusters"
+		cmd = append(cmd, "--all-clusters")
 	}
 	if showAllControllers {
-		cmd += " --all-controllers"
+		cmd = append(cmd, "--all-controllers")
 	}
 	if showHealth {
-		cmd += " --health"
+		cmd = append(cmd, "--health")
 	}
 	if showAllNodes {
-		cmd += " --all-nodes"
+		cmd = append(cmd, "--all-nodes")
 	}
 	if showAllRedirects {
-		cmd += " --all-redirects"
+		cmd = append(cmd, "--all-redirects")
 	}
 	if brief {
-		cmd += " --brief"
+		cmd = append(cmd, "--brief")
 	}
 
-	output, err := runCiliumDbgCommand(cmd, nodeName)
+	output, err := runCiliumDbgCommandWithContext(ctx, cmd, nodeName)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("Failed to get daemon status: %v", err)), nil
 	}
 	return mcp.NewToolResultText(output), nil
 }
 
+func handleBatchDbg(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+	commandsParam := mcp.ParseString(request, "commands", "")
+	nodeName := mcp.ParseString(request, "node_name", "")
+
+	var commands [][]string
+	for _, line := range strings.Split(commandsParam, "\n") {
+		if cmdParts := strings.Fields(line); len(cmdParts) > 0 {
+			commands = append(commands, cmdParts)
+		}
+	}
+	if len(commands) == 0 {
+		return mcp.NewToolResultError("commands parameter is required"), nil
+	}
+
+	results, err := runCiliumDbgCommandsWithContext(ctx, commands, nodeName)
+	if err != nil {
+		return mcp.NewToolResultError(fmt.Sprintf("Failed to run cilium-dbg commands: %v", err)), nil
+	}
+
+	var output strings.Builder
+	for i, result := range results {
+		if i > 0 {
+			output.WriteString("\n\n")
+		}
+		output.WriteString("$ cilium-dbg " + strings.Join(commands[i], " ") + "\n")
+		if result.err != nil {
+			output.WriteString("Error: " + result.err.Error())
+		} else {
+			output.WriteString(result.output)
+		}
+	}
+	return mcp.NewToolResultText(output.String()), nil
+}
+
 func RegisterCiliumDbgTools(s *server.MCPServer) {
 	s.AddTool(mcp.NewTool("cilium_get_endpoint_details",
 		mcp.WithDescription("List the details of an endpoint in the cluster"),
@@ -1380,4 +1593,10 @@ func RegisterCiliumDbgTools(s *server.MCPServer) {
 		mcp.WithString("id", mcp.Description("The id to update the PCAP recorder with")),
 		mcp.WithString("node_name", mcp.Description("The name of the node to update the PCAP recorder on")),
 	), handleUpdatePCAPRecorder)
+
+	s.AddTool(mcp.NewTool("cilium_batch_dbg",
+		mcp.WithDescription("Run several cilium-dbg commands on the same node in one call"),
+		mcp.WithString("commands", mcp.Description("Newline-separated cilium-dbg subcommands to run in order (e.g. 'endpoint list\nidentity list')"), mcp.Required()),
+		mcp.WithString("node_name", mcp.Description("The name of the node to run the commands on")),
+	), handleBatchDbg)
 }
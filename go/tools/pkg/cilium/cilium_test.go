@@ -1,8 +1,14 @@
 package cilium
 
 import (
+	"errors"
 	"strings"
 	"testing"
+
+	"github.com/kagent-dev/kagent/go/tools/pkg/utils"
+	"github.com/mark3labs/mcp-go/mcp"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
 )
 
 func TestCiliumStatusAndVersion(t *testing.T) {
@@ -279,3 +285,97 @@ func TestCiliumDbgParameterParsing(t *testing.T) {
 		}
 	}
 }
+
+func TestHandleGetEndpointDetails(t *testing.T) {
+	nodeName := "details-node"
+	defer invalidateCiliumPodName(nodeName)
+
+	mock := utils.NewMockShellExecutor()
+	mock.AddCommandString("kubectl",
+		[]string{"exec", "pod/cilium-details", "-n", "kube-system", "--", "cilium-dbg", "endpoint", "get", "-l", "k8s:app=web", "-l", "k8s:env=prod", "-o", "yaml"},
+		"endpoint details", nil)
+	ctx := utils.WithShellExecutor(newCiliumTestContext("cilium-details"), mock)
+
+	t.Run("labels", func(t *testing.T) {
+		request := mcp.CallToolRequest{}
+		request.Params.Arguments = map[string]interface{}{
+			"labels":        "k8s:app=web k8s:env=prod",
+			"output_format": "yaml",
+			"node_name":     nodeName,
+		}
+
+		result, err := handleGetEndpointDetails(ctx, request)
+		require.NoError(t, err)
+		assert.False(t, result.IsError)
+		assert.Equal(t, "endpoint details", result.Content[0].(mcp.TextContent).Text)
+	})
+
+	t.Run("missing endpoint", func(t *testing.T) {
+		request := mcp.CallToolRequest{}
+		request.Params.Arguments = map[string]interface{}{"node_name": nodeName}
+
+		result, err := handleGetEndpointDetails(ctx, request)
+		require.NoError(t, err)
+		assert.True(t, result.IsError)
+	})
+
+	assert.Len(t, mock.GetCallLog(), 1)
+}
+
+func TestHandleBatchDbg(t *testing.T) {
+	nodeName := "batch-node"
+	defer invalidateCiliumPodName(nodeName)
+
+	mock := utils.NewMockShellExecutor()
+	mock.AddCommandString("kubectl",
+		[]string{"exec", "pod/cilium-batch", "-n", "kube-system", "--", "cilium-dbg", "endpoint", "list"},
+		"endpoints", nil)
+	mock.AddCommandString("kubectl",
+		[]string{"exec", "pod/cilium-batch", "-n", "kube-system", "--", "cilium-dbg", "identity", "get", "1234"},
+		"", errors.New("identity not found"))
+	ctx := utils.WithShellExecutor(newCiliumTestContext("cilium-batch"), mock)
+
+	request := mcp.CallToolRequest{}
+	request.Params.Arguments = map[string]interface{}{
+		"commands":  "endpoint list\n\nidentity get 1234\n",
+		"node_name": nodeName,
+	}
+
+	result, err := handleBatchDbg(ctx, request)
+	require.NoError(t, err)
+	assert.False(t, result.IsError)
+	text := result.Content[0].(mcp.TextContent).Text
+	assert.Contains(t, text, "$ cilium-dbg endpoint list\nendpoints")
+	assert.Contains(t, text, "$ cilium-dbg identity get 1234\nError: ")
+	assert.Contains(t, text, "identity not found")
+	assert.Len(t, mock.GetCallLog(), 2)
+
+	request.Params.Arguments = map[string]interface{}{"commands": "\n  \n"}
+	result, err = handleBatchDbg(ctx, request)
+	require.NoError(t, err)
+	assert.True(t, result.IsError)
+}
+
+func TestHandleBatchDbgSession(t *testing.T) {
+	nodeName := "batch-session-node"
+	defer invalidateCiliumPodName(nodeName)
+	defer dropNodeSession(nodeName)
+
+	executor := newSessionExecutor(t, "#!/bin/sh\necho \"$@\"\n")
+	ctx := utils.WithShellExecutor(newCiliumTestContext("cilium-session"), executor)
+
+	request := mcp.CallToolRequest{}
+	request.Params.Arguments = map[string]interface{}{
+		"commands":  "endpoint list\nnodes list",
+		"node_name": nodeName,
+	}
+	for i := 0; i < 2; i++ {
+		result, err := handleBatchDbg(ctx, request)
+		require.NoError(t, err)
+		assert.False(t, result.IsError)
+		assert.Equal(t, "$ cilium-dbg endpoint list\nendpoint list\n\n$ cilium-dbg nodes list\nnodes list",
+			result.Content[0].(mcp.TextContent).Text)
+	}
+	assert.Equal(t, []string{"pod/cilium-session"}, executor.started, "the session should be reused across calls")
+	assert.Empty(t, executor.GetCallLog(), "no command should bypass the session")
+}
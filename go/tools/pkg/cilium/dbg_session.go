@@ -0,0 +1,323 @@
+package cilium
+
+import (
+	"bufio"
+	"context"
+	"errors"
+	"fmt"
+	"io"
+	"os/exec"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/google/uuid"
+	"github.com/kagent-dev/kagent/go/tools/pkg/utils"
+)
+
+var (
+	errCiliumDbgSessionClosed = errors.New("cilium-dbg session closed")
+	// errCiliumDbgNothingSent marks session failures that happened before any command reached
+	// the pod, so the commands can safely be retried elsewhere
+	errCiliumDbgNothingSent = fmt.Errorf("%w before any command was sent", errCiliumDbgSessionClosed)
+)
+
+// ciliumDbgSession is a long-lived `kubectl exec -i <pod> -- sh` process that
+// cilium-dbg commands are piped through, so each call does not pay for a new
+// kubectl process and API server exec handshake.
+type ciliumDbgSession struct {
+	mu       sync.Mutex
+	podName  string
+	sentinel string
+	cmd      *exec.Cmd
+	stdin    io.WriteCloser
+	stdout   *bufio.Reader
+	closed   bool
+}
+
+var (
+	ciliumDbgSessionsMu sync.Mutex
+	// ciliumDbgSessions holds one session slot per node name ("" is any cilium pod)
+	ciliumDbgSessions = map[string]*ciliumDbgSessionSlot{}
+)
+
+// ciliumDbgAbandonTimeout bounds how long commands whose caller has gone away may keep the
+// session busy before it is killed
+const ciliumDbgAbandonTimeout = time.Minute
+
+func startCiliumDbgSession(ctx context.Context, podName string) (*ciliumDbgSession, error) {
+	// A session needs an executor that can hand out a long-lived process; otherwise every
+	// command is run through the executor instead
+	starter, ok := utils.GetShellExecutor(ctx).(utils.CommandStarter)
+	if !ok {
+		return nil, errors.New("shell executor cannot start a cilium-dbg session")
+	}
+	cmd := starter.Command("kubectl", "exec", "-i", podName, "-n", "kube-system", "--", "sh")
+	return newCiliumDbgSession(cmd, podName)
+}
+
+func newCiliumDbgSession(cmd *exec.Cmd, podName string) (*ciliumDbgSession, error) {
+	stdin, err := cmd.StdinPipe()
+	if err != nil {
+		return nil, fmt.Errorf("failed to open cilium-dbg session stdin: %v", err)
+	}
+	stdout, err := cmd.StdoutPipe()
+	if err != nil {
+		return nil, fmt.Errorf("failed to open cilium-dbg session stdout: %v", err)
+	}
+	// kubectl errors (e.g. pod not found) end up in the stream and surface as a session failure
+	cmd.Stderr = cmd.Stdout
+	if err := cmd.Start(); err != nil {
+		return nil, fmt.Errorf("failed to start cilium-dbg session: %v", err)
+	}
+
+	return &ciliumDbgSession{
+		podName:  podName,
+		sentinel: "__KAGENT_CILIUM_DBG_" + strings.ReplaceAll(uuid.NewString(), "-", "") + "__",
+		cmd:      cmd,
+		stdin:    stdin,
+		stdout:   bufio.NewReader(stdout),
+	}, nil
+}
+
+// ciliumDbgResult is the outcome of a single cilium-dbg invocation
+type ciliumDbgResult struct {
+	output string
+	err    error
+}
+
+// run executes `cilium-dbg <args...>` in the session and returns its combined output.
+// Session-level failures (broken pipe, kubectl exiting) close the session and return
+// an error wrapping errCiliumDbgSessionClosed.
+func (s *ciliumDbgSession) run(ctx context.Context, args []string) (string, error) {
+	results, err := s.runAll(ctx, [][]string{args})
+	if err != nil {
+		return "", err
+	}
+	return results[0].output, results[0].err
+}
+
+// runAll writes all commands to the session at once and collects one result per
+// command, in order. The returned error is only set for session-level failures;
+// if the session breaks after the script was sent, the results are still returned
+// and commands without an outcome carry the session error. A caller whose context
+// ends stops waiting, but the commands already sent finish in the background so
+// the session stays usable for other callers.
+func (s *ciliumDbgSession) runAll(ctx context.Context, commands [][]string) ([]ciliumDbgResult, error) {
+	s.mu.Lock()
+	if s.closed {
+		s.mu.Unlock()
+		return nil, errCiliumDbgNothingSent
+	}
+
+	var script strings.Builder
+	for _, args := range commands {
+		script.WriteString(buildCiliumDbgScript(args, s.sentinel))
+	}
+
+	done := make(chan ciliumDbgExchange, 1)
+	go func() {
+		defer s.mu.Unlock()
+		done <- s.exchange(ctx, script.String(), commands)
+	}()
+
+	var res ciliumDbgExchange
+	select {
+	case res = <-done:
+	case <-ctx.Done():
+		go func() {
+			select {
+			case <-done:
+			case <-time.After(ciliumDbgAbandonTimeout):
+				s.kill()
+			}
+		}()
+		return nil, ctx.Err()
+	}
+
+	var sessionErr error
+	if res.err != nil {
+		if !res.sent {
+			return nil, fmt.Errorf("%w: %v", errCiliumDbgNothingSent, res.err)
+		}
+		sessionErr = fmt.Errorf("%w: %v", errCiliumDbgSessionClosed, res.err)
+	}
+
+	results := make([]ciliumDbgResult, len(commands))
+	for i := range results {
+		if i >= len(res.frames) {
+			// The command may or may not have run, its outcome is unknown
+			results[i].err = sessionErr
+			continue
+		}
+		f := res.frames[i]
+		if f.exitCode != 0 {
+			results[i].err = fmt.Errorf("command cilium-dbg failed: exit status %d: %s", f.exitCode, f.output)
+			continue
+		}
+		results[i].output = f.output
+	}
+	return results, sessionErr
+}
+
+type ciliumDbgFrame struct {
+	output   string
+	exitCode int
+}
+
+// ciliumDbgExchange is what came back from the session for one script
+type ciliumDbgExchange struct {
+	frames []ciliumDbgFrame
+	sent   bool
+	err    error
+}
+
+// exchange writes the script and reads one frame per command, recording each command like
+// any other exec. It must be called with s.mu held and closes the session on failure.
+func (s *ciliumDbgSession) exchange(ctx context.Context, script string, commands [][]string) ciliumDbgExchange {
+	if n, err := io.WriteString(s.stdin, script); err != nil {
+		s.closeLocked()
+		return ciliumDbgExchange{sent: n > 0, err: err}
+	}
+
+	frames := make([]ciliumDbgFrame, 0, len(commands))
+	for _, args := range commands {
+		// The shell runs the commands one after another, so each frame times its own command
+		_, finish := utils.TraceCommand(ctx, "cilium-dbg", args)
+		output, exitCode, err := readCiliumDbgFrame(s.stdout, s.sentinel)
+		if err != nil {
+			finish(0, err)
+			s.closeLocked()
+			return ciliumDbgExchange{frames: frames, sent: true, err: err}
+		}
+		var cmdErr error
+		if exitCode != 0 {
+			cmdErr = fmt.Errorf("exit status %d", exitCode)
+		}
+		finish(len(output), cmdErr)
+		frames = append(frames, ciliumDbgFrame{output: output, exitCode: exitCode})
+	}
+	return ciliumDbgExchange{frames: frames, sent: true}
+}
+
+func (s *ciliumDbgSession) close() {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.closeLocked()
+}
+
+// kill stops the session process without waiting for the lock, unblocking a stuck exchange
+func (s *ciliumDbgSession) kill() {
+	if s.cmd.Process != nil {
+		_ = s.cmd.Process.Kill()
+	}
+}
+
+func (s *ciliumDbgSession) closeLocked() {
+	if s.closed {
+		return
+	}
+	s.closed = true
+	_ = s.stdin.Close()
+	if s.cmd.Process != nil {
+		_ = s.cmd.Process.Kill()
+	}
+	go func() { _ = s.cmd.Wait() }()
+}
+
+// buildCiliumDbgScript renders a shell line that runs cilium-dbg with the given
+// arguments and then prints the sentinel followed by the exit code on its own line.
+// stdin is redirected so a command that reads it cannot consume the rest of the script.
+func buildCiliumDbgScript(args []string, sentinel string) string {
+	var b strings.Builder
+	b.WriteString("cilium-dbg")
+	for _, arg := range args {
+		b.WriteByte(' ')
+		b.WriteString(shellQuote(arg))
+	}
+	b.WriteString(" </dev/null 2>&1; rc=$?; echo; echo ")
+	b.WriteString(sentinel)
+	b.WriteString(" $rc\n")
+	return b.String()
+}
+
+// readCiliumDbgFrame reads output lines until the sentinel line and returns the
+// output and the exit code reported by the shell.
+func readCiliumDbgFrame(r *bufio.Reader, sentinel string) (string, int, error) {
+	var b strings.Builder
+	prefix := sentinel + " "
+	for {
+		line, err := r.ReadString('\n')
+		if strings.HasPrefix(line, prefix) {
+			exitCode, convErr := strconv.Atoi(strings.TrimSpace(strings.TrimPrefix(line, prefix)))
+			if convErr != nil {
+				return "", 0, fmt.Errorf("malformed cilium-dbg exit status %q", line)
+			}
+			return strings.TrimSpace(b.String()), exitCode, nil
+		}
+		b.WriteString(line)
+		if err != nil {
+			if err == io.EOF {
+				return "", 0, fmt.Errorf("session ended: %s", strings.TrimSpace(b.String()))
+			}
+			return "", 0, err
+		}
+	}
+}
+
+func shellQuote(arg string) string {
+	return "'" + strings.ReplaceAll(arg, "'", `'\''`) + "'"
+}
+
+// ciliumDbgSessionSlot holds the session for one node. Its lock is held while the session is
+// being started, so a slow or unreachable node only delays callers for that node.
+type ciliumDbgSessionSlot struct {
+	mu      sync.Mutex
+	session *ciliumDbgSession
+}
+
+func getCiliumDbgSessionSlot(nodeName string) *ciliumDbgSessionSlot {
+	ciliumDbgSessionsMu.Lock()
+	defer ciliumDbgSessionsMu.Unlock()
+	slot, ok := ciliumDbgSessions[nodeName]
+	if !ok {
+		slot = &ciliumDbgSessionSlot{}
+		ciliumDbgSessions[nodeName] = slot
+	}
+	return slot
+}
+
+// getCiliumDbgSession returns the live session for the node, starting one if needed.
+// A session that cannot be started is reported as errCiliumDbgNothingSent.
+func getCiliumDbgSession(ctx context.Context, nodeName string) (*ciliumDbgSession, error) {
+	slot := getCiliumDbgSessionSlot(nodeName)
+	slot.mu.Lock()
+	defer slot.mu.Unlock()
+
+	if slot.session != nil {
+		return slot.session, nil
+	}
+
+	podName, err := getCiliumPodNameWithContext(ctx, nodeName)
+	if err != nil {
+		return nil, err
+	}
+	session, err := startCiliumDbgSession(ctx, podName)
+	if err != nil {
+		return nil, fmt.Errorf("%w: %v", errCiliumDbgNothingSent, err)
+	}
+	slot.session = session
+	return session, nil
+}
+
+// dropCiliumDbgSession closes and forgets the session if it is still the one registered for the node.
+func dropCiliumDbgSession(nodeName string, session *ciliumDbgSession) {
+	slot := getCiliumDbgSessionSlot(nodeName)
+	slot.mu.Lock()
+	if slot.session == session {
+		slot.session = nil
+	}
+	slot.mu.Unlock()
+	session.close()
+}
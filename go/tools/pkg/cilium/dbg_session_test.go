@@ -0,0 +1,372 @@
+package cilium
+
+import (
+	"bufio"
+	"context"
+	"errors"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"strings"
+	"testing"
+	"time"
+
+	"github.com/kagent-dev/kagent/go/tools/pkg/utils"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+	corev1 "k8s.io/api/core/v1"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+	"k8s.io/client-go/kubernetes"
+	"k8s.io/client-go/kubernetes/fake"
+)
+
+func TestShellQuote(t *testing.T) {
+	testCases := []struct {
+		arg      string
+		expected string
+	}{
+		{arg: "list", expected: "'list'"},
+		{arg: "k8s:app=test env=prod", expected: "'k8s:app=test env=prod'"},
+		{arg: "it's", expected: `'it'\''s'`},
+		{arg: "", expected: "''"},
+	}
+
+	for _, tc := range testCases {
+		assert.Equal(t, tc.expected, shellQuote(tc.arg), "shellQuote(%q)", tc.arg)
+	}
+}
+
+func TestBuildCiliumDbgScript(t *testing.T) {
+	script := buildCiliumDbgScript([]string{"endpoint", "get", "1234"}, "SENTINEL")
+	expected := "cilium-dbg 'endpoint' 'get' '1234' </dev/null 2>&1; rc=$?; echo; echo SENTINEL $rc\n"
+	assert.Equal(t, expected, script)
+}
+
+func TestReadCiliumDbgFrame(t *testing.T) {
+	r := bufio.NewReader(strings.NewReader("line one\nline two\n\nSENTINEL 0\nnext\n\nSENTINEL 2\n"))
+
+	output, exitCode, err := readCiliumDbgFrame(r, "SENTINEL")
+	require.NoError(t, err)
+	assert.Equal(t, 0, exitCode)
+	assert.Equal(t, "line one\nline two", output)
+
+	output, exitCode, err = readCiliumDbgFrame(r, "SENTINEL")
+	require.NoError(t, err)
+	assert.Equal(t, 2, exitCode)
+	assert.Equal(t, "next", output)
+
+	_, _, err = readCiliumDbgFrame(r, "SENTINEL")
+	assert.Error(t, err, "expected an error when the stream ends before the sentinel")
+}
+
+func TestCiliumDbgSessionRun(t *testing.T) {
+	if _, err := exec.LookPath("sh"); err != nil {
+		t.Skip("sh not available")
+	}
+
+	// Stand in for the cilium-dbg binary inside the pod
+	binDir := t.TempDir()
+	fakeCiliumDbg := "#!/bin/sh\nif [ \"$1\" = fail ]; then echo boom; exit 3; fi\nif [ \"$1\" = read ]; then cat; fi\necho \"$@\"\n"
+	require.NoError(t, os.WriteFile(filepath.Join(binDir, "cilium-dbg"), []byte(fakeCiliumDbg), 0o755))
+
+	cmd := exec.Command("sh")
+	cmd.Env = append(os.Environ(), "PATH="+binDir+string(os.PathListSeparator)+os.Getenv("PATH"))
+	session, err := newCiliumDbgSession(cmd, "pod/cilium-test")
+	require.NoError(t, err)
+	defer session.close()
+
+	output, err := session.run(context.Background(), []string{"endpoint", "labels", "k8s:app=a b"})
+	require.NoError(t, err)
+	assert.Equal(t, "endpoint labels k8s:app=a b", output)
+
+	// A command failure carries the output and leaves the session usable
+	_, err = session.run(context.Background(), []string{"fail"})
+	require.Error(t, err)
+	assert.NotErrorIs(t, err, errCiliumDbgSessionClosed)
+	assert.Contains(t, err.Error(), "boom")
+
+	output, err = session.run(context.Background(), []string{"identity", "list"})
+	require.NoError(t, err)
+	assert.Equal(t, "identity list", output)
+
+	// A command reading stdin must not swallow the commands queued after it
+	results, err := session.runAll(context.Background(), [][]string{{"read"}, {"endpoint", "list"}})
+	require.NoError(t, err)
+	require.Len(t, results, 2)
+	assert.Equal(t, "read", results[0].output)
+	assert.Equal(t, "endpoint list", results[1].output)
+
+	results, err = session.runAll(context.Background(), [][]string{{"endpoint", "list"}, {"fail"}, {"nodes", "list"}})
+	require.NoError(t, err)
+	require.Len(t, results, 3)
+	assert.Equal(t, "endpoint list", results[0].output)
+	assert.Error(t, results[1].err)
+	assert.NoError(t, results[2].err)
+	assert.Equal(t, "nodes list", results[2].output)
+
+	session.close()
+	_, err = session.run(context.Background(), []string{"identity", "list"})
+	assert.ErrorIs(t, err, errCiliumDbgNothingSent)
+}
+
+func TestCiliumDbgSessionBreaksMidScript(t *testing.T) {
+	if _, err := exec.LookPath("sh"); err != nil {
+		t.Skip("sh not available")
+	}
+
+	// "die" takes the session shell down with it, as a restarted pod would
+	binDir := t.TempDir()
+	fakeCiliumDbg := "#!/bin/sh\nif [ \"$1\" = die ]; then kill -9 $PPID; exit 1; fi\necho \"$@\"\n"
+	require.NoError(t, os.WriteFile(filepath.Join(binDir, "cilium-dbg"), []byte(fakeCiliumDbg), 0o755))
+
+	cmd := exec.Command("sh")
+	cmd.Env = append(os.Environ(), "PATH="+binDir+string(os.PathListSeparator)+os.Getenv("PATH"))
+	session, err := newCiliumDbgSession(cmd, "pod/cilium-test")
+	require.NoError(t, err)
+	defer session.close()
+
+	results, err := session.runAll(context.Background(), [][]string{{"endpoint", "list"}, {"die"}, {"nodes", "list"}})
+	require.ErrorIs(t, err, errCiliumDbgSessionClosed)
+	assert.NotErrorIs(t, err, errCiliumDbgNothingSent, "the script was sent, retrying could run commands twice")
+	require.Len(t, results, 3)
+	assert.NoError(t, results[0].err)
+	assert.Equal(t, "endpoint list", results[0].output)
+	assert.ErrorIs(t, results[1].err, errCiliumDbgSessionClosed)
+	assert.ErrorIs(t, results[2].err, errCiliumDbgSessionClosed)
+}
+
+func TestGetCiliumPodNameCache(t *testing.T) {
+	nodeName := "test-node"
+	defer invalidateCiliumPodName(nodeName)
+
+	clientset := fake.NewSimpleClientset(&corev1.Pod{
+		ObjectMeta: metav1.ObjectMeta{
+			Name:      "cilium-abcde",
+			Namespace: "kube-system",
+			Labels:    map[string]string{"k8s-app": "cilium"},
+		},
+	})
+	ctx := context.WithValue(context.Background(), clientsetKey{}, kubernetes.Interface(clientset))
+
+	podName, err := getCiliumPodNameWithContext(ctx, nodeName)
+	require.NoError(t, err)
+	assert.Equal(t, "pod/cilium-abcde", podName)
+
+	podName, err = getCiliumPodNameWithContext(ctx, nodeName)
+	require.NoError(t, err)
+	assert.Equal(t, "pod/cilium-abcde", podName)
+	assert.Len(t, clientset.Actions(), 1, "second lookup should be served from the cache")
+
+	invalidateCiliumPodName(nodeName)
+	_, err = getCiliumPodNameWithContext(ctx, nodeName)
+	require.NoError(t, err)
+	assert.Len(t, clientset.Actions(), 2, "lookup after invalidation should hit the API server")
+}
+
+func TestLookupCiliumPodNameWithKubectl(t *testing.T) {
+	mock := utils.NewMockShellExecutor()
+	mock.AddCommandString("kubectl",
+		[]string{"get", "pod", "-l", "k8s-app=cilium", "-o", "name", "-n", "kube-system", "--field-selector", "spec.nodeName=test-node"},
+		"pod/cilium-abcde\npod/cilium-fghij", nil)
+	ctx := utils.WithShellExecutor(context.Background(), mock)
+
+	podName, err := lookupCiliumPodNameWithKubectl(ctx, "test-node")
+	require.NoError(t, err)
+	assert.Equal(t, "pod/cilium-abcde", podName)
+}
+
+func TestExecCiliumDbgCommand(t *testing.T) {
+	nodeName := "exec-node"
+	defer invalidateCiliumPodName(nodeName)
+
+	clientset := fake.NewSimpleClientset(&corev1.Pod{
+		ObjectMeta: metav1.ObjectMeta{
+			Name:      "cilium-xyz",
+			Namespace: "kube-system",
+			Labels:    map[string]string{"k8s-app": "cilium"},
+		},
+	})
+	mock := utils.NewMockShellExecutor()
+	mock.AddCommandString("kubectl",
+		[]string{"exec", "pod/cilium-xyz", "-n", "kube-system", "--", "cilium-dbg", "recorder", "update", "1", "--filters", "2.2.2.2/0 0 1.2.3.4/32 80 TCP"},
+		"updated", nil)
+	ctx := utils.WithShellExecutor(context.WithValue(context.Background(), clientsetKey{}, kubernetes.Interface(clientset)), mock)
+
+	output, err := execCiliumDbgCommand(ctx, []string{"recorder", "update", "1", "--filters", "2.2.2.2/0 0 1.2.3.4/32 80 TCP"}, nodeName)
+	require.NoError(t, err)
+	assert.Equal(t, "updated", output)
+}
+
+func TestExecCiliumDbgCommandKeepsPodOnCommandFailure(t *testing.T) {
+	nodeName := "exec-fail-node"
+	defer invalidateCiliumPodName(nodeName)
+
+	mock := utils.NewMockShellExecutor()
+	mock.AddPartialMatcherString("kubectl",
+		[]string{"exec", "*", "-n", "kube-system", "--", "cilium-dbg", "endpoint", "get", "42"},
+		"", errors.New("exit status 1"))
+
+	// cilium-dbg failing inside a running pod keeps the cached name
+	ctx := utils.WithShellExecutor(newCiliumTestContext("cilium-live"), mock)
+	_, err := execCiliumDbgCommand(ctx, []string{"endpoint", "get", "42"}, nodeName)
+	require.Error(t, err)
+	ciliumPodNamesMu.Lock()
+	cached, ok := ciliumPodNames[nodeName]
+	ciliumPodNamesMu.Unlock()
+	assert.True(t, ok, "cached pod name should survive a command failure")
+	assert.Equal(t, "pod/cilium-live", cached.podName)
+
+	// Once the pod is gone the cached name is dropped
+	ctx = utils.WithShellExecutor(newCiliumTestContext("cilium-replacement"), mock)
+	_, err = execCiliumDbgCommand(ctx, []string{"endpoint", "get", "42"}, nodeName)
+	require.Error(t, err)
+	ciliumPodNamesMu.Lock()
+	_, ok = ciliumPodNames[nodeName]
+	ciliumPodNamesMu.Unlock()
+	assert.False(t, ok, "cached pod name should be dropped once the pod is gone")
+}
+
+// newCiliumTestContext returns a context whose cilium pod lookups are served by a fake clientset
+func newCiliumTestContext(podName string) context.Context {
+	clientset := fake.NewSimpleClientset(&corev1.Pod{
+		ObjectMeta: metav1.ObjectMeta{
+			Name:      podName,
+			Namespace: "kube-system",
+			Labels:    map[string]string{"k8s-app": "cilium"},
+		},
+	})
+	return context.WithValue(context.Background(), clientsetKey{}, kubernetes.Interface(clientset))
+}
+
+// sessionExecutor serves one-off commands from the mock and starts sessions as local shells
+// running a fake cilium-dbg
+type sessionExecutor struct {
+	*utils.MockShellExecutor
+	binDir  string
+	started []string
+}
+
+func newSessionExecutor(t *testing.T, fakeCiliumDbg string) *sessionExecutor {
+	if _, err := exec.LookPath("sh"); err != nil {
+		t.Skip("sh not available")
+	}
+	binDir := t.TempDir()
+	require.NoError(t, os.WriteFile(filepath.Join(binDir, "cilium-dbg"), []byte(fakeCiliumDbg), 0o755))
+	return &sessionExecutor{MockShellExecutor: utils.NewMockShellExecutor(), binDir: binDir}
+}
+
+func (e *sessionExecutor) Command(command string, args ...string) *exec.Cmd {
+	// kubectl exec -i <pod> ...
+	e.started = append(e.started, args[2])
+	cmd := exec.Command("sh")
+	cmd.Env = append(os.Environ(), "BIN_DIR="+e.binDir, "PATH="+e.binDir+string(os.PathListSeparator)+os.Getenv("PATH"))
+	return cmd
+}
+
+// dropNodeSession closes the session registered for the node, if any
+func dropNodeSession(nodeName string) {
+	slot := getCiliumDbgSessionSlot(nodeName)
+	slot.mu.Lock()
+	session := slot.session
+	slot.mu.Unlock()
+	if session != nil {
+		dropCiliumDbgSession(nodeName, session)
+	}
+}
+
+func TestCiliumDbgSessionSurvivesCancelledCaller(t *testing.T) {
+	executor := newSessionExecutor(t, "#!/bin/sh\nif [ \"$1\" = slow ]; then sleep 0.3; fi\necho \"$@\"\n")
+	session, err := startCiliumDbgSession(utils.WithShellExecutor(context.Background(), executor), "pod/cilium-test")
+	require.NoError(t, err)
+	defer session.close()
+
+	ctx, cancel := context.WithTimeout(context.Background(), 50*time.Millisecond)
+	defer cancel()
+	_, err = session.run(ctx, []string{"slow"})
+	require.ErrorIs(t, err, context.DeadlineExceeded)
+
+	// Another caller waits for the abandoned command and then uses the same session
+	output, err := session.run(context.Background(), []string{"nodes", "list"})
+	require.NoError(t, err)
+	assert.Equal(t, "nodes list", output)
+	assert.Len(t, executor.started, 1)
+}
+
+func TestRunCiliumDbgCommandsRetriesReadOnly(t *testing.T) {
+	nodeName := "retry-node"
+	defer invalidateCiliumPodName(nodeName)
+	defer dropNodeSession(nodeName)
+
+	// The first session goes stale as soon as a command is run in it
+	fakeCiliumDbg := "#!/bin/sh\nif [ ! -e \"$BIN_DIR/stale\" ]; then touch \"$BIN_DIR/stale\"; kill -9 $PPID; exit 1; fi\necho \"$@\"\n"
+	executor := newSessionExecutor(t, fakeCiliumDbg)
+	ctx := utils.WithShellExecutor(newCiliumTestContext("cilium-retry"), executor)
+
+	results, err := runCiliumDbgCommandsWithContext(ctx, [][]string{{"endpoint", "list"}, {"service", "delete", "1"}}, nodeName)
+	require.NoError(t, err)
+	require.Len(t, results, 2)
+	assert.NoError(t, results[0].err)
+	assert.Equal(t, "endpoint list", results[0].output)
+	assert.ErrorIs(t, results[1].err, errCiliumDbgSessionClosed, "mutating commands must not be retried")
+	assert.Len(t, executor.started, 2)
+}
+
+func TestIsReadOnlyCiliumDbgCommand(t *testing.T) {
+	assert.True(t, isReadOnlyCiliumDbgCommand([]string{"endpoint", "list"}))
+	assert.True(t, isReadOnlyCiliumDbgCommand([]string{"bpf", "map", "get", "cilium_lxc"}))
+	assert.True(t, isReadOnlyCiliumDbgCommand([]string{"debuginfo"}))
+	assert.False(t, isReadOnlyCiliumDbgCommand([]string{"service", "delete", "1"}))
+	assert.False(t, isReadOnlyCiliumDbgCommand([]string{"kvstore", "set", "list=1"}))
+	assert.False(t, isReadOnlyCiliumDbgCommand([]string{"endpoint", "config", "12", "--", "get"}))
+	assert.False(t, isReadOnlyCiliumDbgCommand([]string{"fqdn", "cache", "clean"}))
+}
+
+// blockingSessionExecutor holds session starts until released
+type blockingSessionExecutor struct {
+	*sessionExecutor
+	starting chan struct{}
+	release  chan struct{}
+}
+
+func (e *blockingSessionExecutor) Command(command string, args ...string) *exec.Cmd {
+	close(e.starting)
+	<-e.release
+	return e.sessionExecutor.Command(command, args...)
+}
+
+func TestGetCiliumDbgSessionPerNodeLock(t *testing.T) {
+	defer invalidateCiliumPodName("stuck-node")
+	defer invalidateCiliumPodName("other-node")
+	defer dropNodeSession("stuck-node")
+	defer dropNodeSession("other-node")
+
+	fakeCiliumDbg := "#!/bin/sh\necho \"$@\"\n"
+	stuck := &blockingSessionExecutor{
+		sessionExecutor: newSessionExecutor(t, fakeCiliumDbg),
+		starting:        make(chan struct{}),
+		release:         make(chan struct{}),
+	}
+	stuckErr := make(chan error, 1)
+	go func() {
+		_, err := getCiliumDbgSession(utils.WithShellExecutor(newCiliumTestContext("cilium-stuck"), stuck), "stuck-node")
+		stuckErr <- err
+	}()
+	<-stuck.starting
+
+	// A node whose session start hangs must not block session lookups for other nodes
+	other := newSessionExecutor(t, fakeCiliumDbg)
+	otherDone := make(chan error, 1)
+	go func() {
+		_, err := getCiliumDbgSession(utils.WithShellExecutor(newCiliumTestContext("cilium-other"), other), "other-node")
+		otherDone <- err
+	}()
+	select {
+	case err := <-otherDone:
+		require.NoError(t, err)
+	case <-time.After(5 * time.Second):
+		require.FailNow(t, "session lookup for another node was blocked")
+	}
+
+	close(stuck.release)
+	require.NoError(t, <-stuckErr)
+}
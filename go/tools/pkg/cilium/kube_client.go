@@ -0,0 +1,49 @@
+package cilium
+
+import (
+	"context"
+	"sync"
+
+	"github.com/kagent-dev/kagent/go/tools/pkg/logger"
+	"k8s.io/client-go/kubernetes"
+	"k8s.io/client-go/rest"
+	"k8s.io/client-go/tools/clientcmd"
+)
+
+// clientsetKey is the context key for the Kubernetes clientset.
+type clientsetKey struct{}
+
+var (
+	defaultClientsetOnce sync.Once
+	defaultClientset     kubernetes.Interface
+)
+
+// getKubeClientset returns the clientset from the context, or a process-wide clientset built from
+// the in-cluster config or kubeconfig. It returns nil when neither is available, in which case
+// callers fall back to kubectl.
+func getKubeClientset(ctx context.Context) kubernetes.Interface {
+	if clientset, ok := ctx.Value(clientsetKey{}).(kubernetes.Interface); ok && clientset != nil {
+		return clientset
+	}
+
+	defaultClientsetOnce.Do(func() {
+		config, err := rest.InClusterConfig()
+		if err != nil {
+			// Same loading rules as kubectl (KUBECONFIG, current context), so the pod is looked up
+			// in the cluster the kubectl exec calls run against
+			config, err = clientcmd.NewNonInteractiveDeferredLoadingClientConfig(
+				clientcmd.NewDefaultClientConfigLoadingRules(), &clientcmd.ConfigOverrides{}).ClientConfig()
+			if err != nil {
+				logger.Get().Info("No Kubernetes client config found, using kubectl to look up cilium pods", "error", err.Error())
+				return
+			}
+		}
+		clientset, err := kubernetes.NewForConfig(config)
+		if err != nil {
+			logger.Get().Error(err, "Failed to create Kubernetes clientset, using kubectl to look up cilium pods")
+			return
+		}
+		defaultClientset = clientset
+	})
+	return defaultClientset
+}
@@ -4,12 +4,72 @@ import (
 	"context"
 	"fmt"
 	"strings"
+	"sync"
+	"time"
 
 	"github.com/kagent-dev/kagent/go/tools/pkg/utils"
 	"github.com/mark3labs/mcp-go/mcp"
 	"github.com/mark3labs/mcp-go/server"
 )
 
+// istioctlCacheTTL is how long the output of a read-only istioctl command is reused
+const istioctlCacheTTL = 30 * time.Second
+
+type istioctlCacheEntry struct {
+	output  string
+	expires time.Time
+}
+
+var (
+	istioctlCacheMu sync.Mutex
+	istioctlCache   = map[string]istioctlCacheEntry{}
+)
+
+// runIstioctlCached runs a read-only istioctl command, reusing a recent successful
+// result for the same arguments instead of spawning istioctl again. Only output that
+// does not follow cluster state belongs here: changes made with kubectl never drop
+// cached results, so e.g. proxy-config must always run istioctl.
+func runIstioctlCached(ctx context.Context, args []string) (string, error) {
+	key := strings.Join(args, "\x00")
+	now := time.Now()
+
+	istioctlCacheMu.Lock()
+	entry, ok := istioctlCache[key]
+	istioctlCacheMu.Unlock()
+	if ok && now.Before(entry.expires) {
+		return entry.output, nil
+	}
+
+	result, err := utils.RunCommandWithContext(ctx, "istioctl", args)
+	if err != nil {
+		return "", err
+	}
+
+	istioctlCacheMu.Lock()
+	for k, e := range istioctlCache {
+		if !now.Before(e.expires) {
+			delete(istioctlCache, k)
+		}
+	}
+	istioctlCache[key] = istioctlCacheEntry{output: result, expires: now.Add(istioctlCacheTTL)}
+	istioctlCacheMu.Unlock()
+	return result, nil
+}
+
+// runIstioctlMutating runs an istioctl command that changes the mesh and drops
+// any cached read-only results, since they may no longer be accurate.
+func runIstioctlMutating(ctx context.Context, args []string) (string, error) {
+	result, err := utils.RunCommandWithContext(ctx, "istioctl", args)
+	resetIstioctlCache()
+	return result, err
+}
+
+func resetIstioctlCache() {
+	istioctlCacheMu.Lock()
+	istioctlCache = map[string]istioctlCacheEntry{}
+	istioctlCacheMu.Unlock()
+}
+
 // Istio proxy status
 func handleIstioProxyStatus(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	podName := mcp.ParseString(request, "pod_name", "")
@@ -65,7 +125,7 @@ func handleIstioInstall(ctx context.Context, request mcp.CallToolRequest) (*mcp.
 
 	args := []string{"install", "--set", fmt.Sprintf("profile=%s", profile), "-y"}
 
-	result, err := utils.RunCommandWithContext(ctx, "istioctl", args)
+	result, err := runIstioctlMutating(ctx, args)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("istioctl install failed: %v", err)), nil
 	}
@@ -118,7 +178,7 @@ func handleIstioVersion(ctx context.Context, request mcp.CallToolRequest) (*mcp.
 		args = append(args, "--short")
 	}
 
-	result, err := utils.RunCommandWithContext(ctx, "istioctl", args)
+	result, err := runIstioctlCached(ctx, args)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("istioctl version failed: %v", err)), nil
 	}
@@ -204,7 +264,7 @@ func handleWaypointApply(ctx context.Context, request mcp.CallToolRequest) (*mcp
 		args = append(args, "--enroll-namespace")
 	}
 
-	result, err := utils.RunCommandWithContext(ctx, "istioctl", args)
+	result, err := runIstioctlMutating(ctx, args)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("istioctl waypoint apply failed: %v", err)), nil
 	}
@@ -227,15 +287,17 @@ func handleWaypointDelete(ctx context.Context, request mcp.CallToolRequest) (*mc
 	if all {
 		args = append(args, "--all")
 	} else if names != "" {
-		namesList := strings.Split(names, ",")
-		for _, name := range namesList {
-			args = append(args, strings.TrimSpace(name))
+		for _, name := range strings.Split(names, ",") {
+			// Skip blanks from stray commas so istioctl never sees an empty argument
+			if name = strings.TrimSpace(name); name != "" {
+				args = append(args, name)
+			}
 		}
 	}
 
 	args = append(args, "-n", namespace)
 
-	result, err := utils.RunCommandWithContext(ctx, "istioctl", args)
+	result, err := runIstioctlMutating(ctx, args)
 	if err != nil {
 		return mcp.NewToolResultError(fmt.Sprintf("istioctl waypoint delete failed: %v", err)), nil
 	}
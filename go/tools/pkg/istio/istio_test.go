@@ -318,6 +318,8 @@ func TestHandleIstioAnalyzeClusterConfiguration(t *testing.T) {
 
 // Test Istio Version
 func TestHandleIstioVersion(t *testing.T) {
+	resetIstioctlCache()
+
 	t.Run("version detailed output", func(t *testing.T) {
 		mock := utils.NewMockShellExecutor()
 		expectedOutput := `client version: 1.18.0
@@ -621,6 +623,28 @@ waypoint/waypoint2 deleted`
 		assert.Equal(t, []string{"waypoint", "delete", "waypoint1", "waypoint2", "-n", "default"}, callLog[0].Args)
 	})
 
+	t.Run("delete waypoints with blank names", func(t *testing.T) {
+		mock := utils.NewMockShellExecutor()
+		mock.AddCommandString("istioctl", []string{"waypoint", "delete", "waypoint1", "waypoint2", "-n", "default"}, "deleted", nil)
+		ctx := utils.WithShellExecutor(context.Background(), mock)
+
+		request := mcp.CallToolRequest{}
+		request.Params.Arguments = map[string]interface{}{
+			"namespace": "default",
+			"names":     "waypoint1, ,waypoint2,",
+		}
+
+		result, err := handleWaypointDelete(ctx, request)
+
+		assert.NoError(t, err)
+		assert.False(t, result.IsError)
+
+		// Verify empty entries were not passed to istioctl
+		callLog := mock.GetCallLog()
+		require.Len(t, callLog, 1)
+		assert.Equal(t, []string{"waypoint", "delete", "waypoint1", "waypoint2", "-n", "default"}, callLog[0].Args)
+	})
+
 	t.Run("missing namespace parameter", func(t *testing.T) {
 		mock := utils.NewMockShellExecutor()
 		ctx := utils.WithShellExecutor(context.Background(), mock)
@@ -867,3 +891,57 @@ listener1         0.0.0.0          15006    TCP`
 		assert.Contains(t, getResultText(result), "istioctl ztunnel-config failed")
 	})
 }
+
+// Test caching of read-only istioctl commands
+func TestIstioctlCache(t *testing.T) {
+	resetIstioctlCache()
+	t.Cleanup(resetIstioctlCache)
+
+	mock := utils.NewMockShellExecutor()
+	mock.AddCommandString("istioctl", []string{"version"}, "client version: 1.18.0", nil)
+	mock.AddCommandString("istioctl", []string{"install", "--set", "profile=default", "-y"}, "✔ Installation complete", nil)
+	ctx := utils.WithShellExecutor(context.Background(), mock)
+
+	request := mcp.CallToolRequest{}
+	for i := 0; i < 2; i++ {
+		result, err := handleIstioVersion(ctx, request)
+		assert.NoError(t, err)
+		assert.False(t, result.IsError)
+		assert.Contains(t, getResultText(result), "client version: 1.18.0")
+	}
+
+	// The second version call is served from the cache
+	require.Len(t, mock.GetCallLog(), 1)
+
+	// A mutating command drops cached results
+	_, err := handleIstioInstall(ctx, request)
+	assert.NoError(t, err)
+	_, err = handleIstioVersion(ctx, request)
+	assert.NoError(t, err)
+
+	callLog := mock.GetCallLog()
+	require.Len(t, callLog, 3)
+	assert.Equal(t, []string{"version"}, callLog[2].Args)
+}
+
+// proxy-config shows live Envoy state, which kubectl changes do not invalidate
+func TestIstioProxyConfigNotCached(t *testing.T) {
+	resetIstioctlCache()
+	t.Cleanup(resetIstioctlCache)
+
+	mock := utils.NewMockShellExecutor()
+	mock.AddCommandString("istioctl", []string{"proxy-config", "routes", "app-1"}, "NAME  VIRTUAL SERVICE", nil)
+	ctx := utils.WithShellExecutor(context.Background(), mock)
+
+	request := mcp.CallToolRequest{}
+	request.Params.Arguments = map[string]interface{}{
+		"pod_name":    "app-1",
+		"config_type": "routes",
+	}
+	for i := 0; i < 2; i++ {
+		result, err := handleIstioProxyConfig(ctx, request)
+		assert.NoError(t, err)
+		assert.False(t, result.IsError)
+	}
+	assert.Len(t, mock.GetCallLog(), 2)
+}
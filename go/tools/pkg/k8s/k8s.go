@@ -18,7 +18,6 @@ import (
 	"github.com/mark3labs/mcp-go/mcp"
 	"github.com/mark3labs/mcp-go/server"
 	"github.com/tmc/langchaingo/llms"
-	"github.com/tmc/langchaingo/llms/openai"
 	v1 "k8s.io/api/apps/v1"
 	corev1 "k8s.io/api/core/v1"
 	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
@@ -643,10 +642,8 @@ func (k *K8sTool) handleGenerateResource(ctx context.Context, request mcp.CallTo
 }
 
 func RegisterK8sTools(s *server.MCPServer) {
-	var llm llms.Model
-	if openAiClient, err := openai.New(); err == nil {
-		llm = openAiClient
-	} else {
+	llm, err := utils.GetSharedLLM()
+	if err != nil {
 		logger.Get().Error(err, "Failed to initialize OpenAI LLM, k8s_generate_resource tool will not be available")
 	}
 
@@ -0,0 +1,89 @@
+package prometheus
+
+import (
+	"context"
+	"net/http"
+	"sync"
+	"time"
+)
+
+// Metadata endpoints change on minute timescales but are polled repeatedly by agents,
+// so their responses are reused for a short while instead of hitting Prometheus each time.
+const (
+	labelsCacheTTL       = 60 * time.Second
+	targetsCacheTTL      = 15 * time.Second
+	staticStatusCacheTTL = time.Hour
+)
+
+// responseCacheRetention is how long an expired entry is kept so it can be revalidated
+// with a conditional request rather than downloaded again.
+const responseCacheRetention = 10 * time.Minute
+
+// responseCacheKey includes the client so responses fetched with different
+// clients (and therefore possibly different credentials) are never shared.
+type responseCacheKey struct {
+	client *http.Client
+	url    string
+}
+
+type responseCacheEntry struct {
+	body         []byte
+	etag         string
+	lastModified string
+	expires      time.Time
+}
+
+var (
+	responseCacheMu sync.Mutex
+	responseCache   = map[responseCacheKey]responseCacheEntry{}
+)
+
+// getPrometheusCached is getPrometheus for slowly changing endpoints: a successful
+// response is reused for ttl. Once it expires, a response that carried an ETag or
+// Last-Modified header is revalidated with a conditional GET, so an unchanged
+// resource costs a 304 instead of a full download. Errors are never cached.
+func getPrometheusCached(ctx context.Context, fullURL string, ttl time.Duration) ([]byte, error) {
+	key := responseCacheKey{client: getHTTPClient(ctx), url: fullURL}
+
+	responseCacheMu.Lock()
+	entry, ok := responseCache[key]
+	responseCacheMu.Unlock()
+	if ok && time.Now().Before(entry.expires) {
+		return entry.body, nil
+	}
+
+	resp, err := fetchPrometheus(ctx, fullURL, entry.etag, entry.lastModified)
+	if err != nil {
+		return nil, err
+	}
+
+	updated := responseCacheEntry{body: resp.body, etag: resp.etag, lastModified: resp.lastModified}
+	if resp.notModified {
+		updated.body = entry.body
+		if updated.etag == "" {
+			updated.etag = entry.etag
+		}
+		if updated.lastModified == "" {
+			updated.lastModified = entry.lastModified
+		}
+	}
+
+	now := time.Now()
+	updated.expires = now.Add(ttl)
+	responseCacheMu.Lock()
+	for k, e := range responseCache {
+		if now.Sub(e.expires) > responseCacheRetention {
+			delete(responseCache, k)
+		}
+	}
+	responseCache[key] = updated
+	responseCacheMu.Unlock()
+	return updated.body, nil
+}
+
+// invalidateCached forgets the cached response for fullURL so the next call fetches it again
+func invalidateCached(ctx context.Context, fullURL string) {
+	responseCacheMu.Lock()
+	delete(responseCache, responseCacheKey{client: getHTTPClient(ctx), url: fullURL})
+	responseCacheMu.Unlock()
+}
@@ -0,0 +1,70 @@
+package prometheus
+
+import (
+	"context"
+	"net/http"
+	"net/http/httptest"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+func TestGetPrometheusCached(t *testing.T) {
+	var calls int32
+	server := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		atomic.AddInt32(&calls, 1)
+		_, _ = w.Write([]byte(`{"status":"success","data":["job"]}`))
+	}))
+	defer server.Close()
+
+	ctx := context.WithValue(context.Background(), clientKey{}, server.Client())
+	fullURL := server.URL + "/api/v1/labels"
+
+	for i := 0; i < 3; i++ {
+		body, err := getPrometheusCached(ctx, fullURL, time.Minute)
+		require.NoError(t, err)
+		assert.Contains(t, string(body), "job")
+	}
+	assert.Equal(t, int32(1), atomic.LoadInt32(&calls))
+
+	// An expired entry is fetched again
+	targetsURL := server.URL + "/api/v1/targets"
+	_, err := getPrometheusCached(ctx, targetsURL, time.Millisecond)
+	require.NoError(t, err)
+	time.Sleep(5 * time.Millisecond)
+	_, err = getPrometheusCached(ctx, targetsURL, time.Minute)
+	require.NoError(t, err)
+	assert.Equal(t, int32(3), atomic.LoadInt32(&calls))
+}
+
+func TestGetPrometheusCachedRevalidates(t *testing.T) {
+	var full, conditional int32
+	server := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		if r.Header.Get("If-None-Match") == `"v1"` {
+			atomic.AddInt32(&conditional, 1)
+			w.WriteHeader(http.StatusNotModified)
+			return
+		}
+		atomic.AddInt32(&full, 1)
+		w.Header().Set("ETag", `"v1"`)
+		_, _ = w.Write([]byte(`{"status":"success","data":{"yaml":"global: {}"}}`))
+	}))
+	defer server.Close()
+
+	ctx := context.WithValue(context.Background(), clientKey{}, server.Client())
+	fullURL := server.URL + "/api/v1/status/config"
+
+	body, err := getPrometheusCached(ctx, fullURL, time.Millisecond)
+	require.NoError(t, err)
+	time.Sleep(5 * time.Millisecond)
+
+	// The expired entry is revalidated and its body reused
+	revalidated, err := getPrometheusCached(ctx, fullURL, time.Minute)
+	require.NoError(t, err)
+	assert.Equal(t, string(body), string(revalidated))
+	assert.Equal(t, int32(1), atomic.LoadInt32(&full))
+	assert.Equal(t, int32(1), atomic.LoadInt32(&conditional))
+}
@@ -1,78 +1,272 @@
 package prometheus
 
 import (
+	"bytes"
 	"context"
 	"encoding/json"
 	"fmt"
-	"io"
+	"net"
 	"net/http"
 	"net/url"
+	"os"
+	"strconv"
+	"strings"
+	"sync"
 	"time"
 
 	"github.com/mark3labs/mcp-go/mcp"
 	"github.com/mark3labs/mcp-go/server"
+	"golang.org/x/sync/singleflight"
 )
 
+// defaultPrometheusURL is the server used when a tool call does not name one. It is
+// read once from PROMETHEUS_URL, falling back to a local Prometheus.
+var defaultPrometheusURL = normalizePrometheusURL(os.Getenv("PROMETHEUS_URL"), "http://localhost:9090")
+
+func normalizePrometheusURL(prometheusURL, fallback string) string {
+	if prometheusURL = strings.TrimRight(strings.TrimSpace(prometheusURL), "/"); prometheusURL == "" {
+		return fallback
+	}
+	return prometheusURL
+}
+
+// getPrometheusURL returns the server for a tool call without a trailing slash, so
+// API paths can be appended directly.
+func getPrometheusURL(request mcp.CallToolRequest) string {
+	return normalizePrometheusURL(mcp.ParseString(request, "prometheus_url", ""), defaultPrometheusURL)
+}
+
 // clientKey is the context key for the http client.
 type clientKey struct{}
 
+// sharedHTTPClient is used by all Prometheus tools so connections to the server are
+// kept alive across tool calls. http.DefaultClient only keeps two idle connections
+// per host, which forces new TCP/TLS handshakes as soon as calls overlap.
+// HTTP/2 is negotiated over TLS so concurrent queries multiplex on one connection, and
+// the transport asks for gzip and transparently decompresses large JSON responses.
+var sharedHTTPClient = &http.Client{
+	Transport: &http.Transport{
+		Proxy: http.ProxyFromEnvironment,
+		DialContext: (&net.Dialer{
+			Timeout:   30 * time.Second,
+			KeepAlive: 30 * time.Second,
+		}).DialContext,
+		MaxIdleConns:          100,
+		MaxIdleConnsPerHost:   20,
+		IdleConnTimeout:       30 * time.Second,
+		TLSHandshakeTimeout:   10 * time.Second,
+		ExpectContinueTimeout: 1 * time.Second,
+		ForceAttemptHTTP2:     true,
+	},
+}
+
 func getHTTPClient(ctx context.Context) *http.Client {
 	if client, ok := ctx.Value(clientKey{}).(*http.Client); ok && client != nil {
 		return client
 	}
-	return http.DefaultClient
+	return sharedHTTPClient
 }
 
-// Prometheus tools using direct HTTP API calls
+// formatUnixTime renders t as the Unix seconds timestamp accepted by the Prometheus API
+func formatUnixTime(t time.Time) string {
+	return strconv.FormatInt(t.Unix(), 10)
+}
 
-func handlePrometheusQueryTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
-	prometheusURL := mcp.ParseString(request, "prometheus_url", "http://localhost:9090")
-	query := mcp.ParseString(request, "query", "")
+// instantQueryURL builds the URL for an instant query in one pass. Instant queries are the
+// hottest path, so this skips building and sorting a url.Values map for two fixed keys.
+func instantQueryURL(apiURL, query, ts string) string {
+	return apiURL + "?query=" + url.QueryEscape(query) + "&time=" + ts
+}
 
-	if query == "" {
-		return mcp.NewToolResultError("query parameter is required"), nil
+// maxBodyPrealloc caps how much of a reported Content-Length is allocated up front, so a bogus
+// header cannot trigger a huge allocation; larger bodies still grow the buffer as they are read.
+const maxBodyPrealloc = 8 << 20
+
+// readResponseBody reads the whole response body. When the server reports a length the
+// buffer is allocated once, instead of growing and copying repeatedly for large results.
+// ReadFrom grows the buffer whenever less than bytes.MinRead is free, so that much
+// headroom is reserved on top of the body to avoid a final reallocation.
+func readResponseBody(resp *http.Response) ([]byte, error) {
+	var buf bytes.Buffer
+	if resp.ContentLength > 0 {
+		buf.Grow(int(min(resp.ContentLength, maxBodyPrealloc)) + bytes.MinRead)
 	}
+	if _, err := buf.ReadFrom(resp.Body); err != nil {
+		return nil, err
+	}
+	return buf.Bytes(), nil
+}
 
-	// Make request to Prometheus API
-	apiURL := fmt.Sprintf("%s/api/v1/query", prometheusURL)
-	params := url.Values{}
-	params.Add("query", query)
-	params.Add("time", fmt.Sprintf("%d", time.Now().Unix()))
+// extractData returns the raw data field of a Prometheus response envelope. The
+// envelope is only scanned; the data itself is never decoded into Go values.
+func extractData(body []byte) ([]byte, error) {
+	var envelope struct {
+		Data json.RawMessage `json:"data"`
+	}
+	if err := json.Unmarshal(body, &envelope); err != nil {
+		return nil, fmt.Errorf("failed to parse response: %w", err)
+	}
+	return envelope.Data, nil
+}
 
-	fullURL := fmt.Sprintf("%s?%s", apiURL, params.Encode())
+// prettyJSON indents a JSON response body without decoding it into Go values,
+// falling back to the raw body if it is not valid JSON.
+func prettyJSON(body []byte) string {
+	var buf bytes.Buffer
+	buf.Grow(len(body) + len(body)/2)
+	if err := json.Indent(&buf, body, "", "  "); err != nil {
+		return string(body)
+	}
+	return buf.String()
+}
+
+// inflight collapses identical concurrent GETs into a single upstream request
+var inflight singleflight.Group
+
+// inflightCall is the context shared by the callers waiting on one in-flight GET. The
+// request is cancelled once the last of them has gone.
+type inflightCall struct {
+	ctx     context.Context
+	cancel  context.CancelFunc
+	waiters int
+}
+
+var (
+	inflightMu    sync.Mutex
+	inflightCalls = map[string]*inflightCall{}
+)
+
+// joinInflight registers the caller as waiting on the shared request for key
+func joinInflight(ctx context.Context, key string) *inflightCall {
+	inflightMu.Lock()
+	defer inflightMu.Unlock()
+	call, ok := inflightCalls[key]
+	if !ok {
+		// Detach from the first caller so its cancellation does not fail the others waiting
+		sharedCtx, cancel := context.WithCancel(context.WithoutCancel(ctx))
+		call = &inflightCall{ctx: sharedCtx, cancel: cancel}
+		inflightCalls[key] = call
+	}
+	call.waiters++
+	return call
+}
 
-	client := getHTTPClient(ctx)
-	resp, err := client.Get(fullURL)
+// leaveInflight unregisters a caller; the last one out cancels the request if it is still
+// running and lets the next caller start a fresh one.
+func leaveInflight(key string, call *inflightCall) {
+	inflightMu.Lock()
+	defer inflightMu.Unlock()
+	call.waiters--
+	if call.waiters > 0 {
+		return
+	}
+	call.cancel()
+	if inflightCalls[key] == call {
+		delete(inflightCalls, key)
+		inflight.Forget(key)
+	}
+}
+
+// prometheusResponse is a successful or not-modified response from the Prometheus API
+type prometheusResponse struct {
+	body         []byte
+	etag         string
+	lastModified string
+	notModified  bool
+}
+
+// getPrometheus performs a GET against the Prometheus API and returns the body of a
+// successful response.
+func getPrometheus(ctx context.Context, fullURL string) ([]byte, error) {
+	resp, err := fetchPrometheus(ctx, fullURL, "", "")
 	if err != nil {
-		return mcp.NewToolResultError("failed to query Prometheus: " + err.Error()), nil
+		return nil, err
+	}
+	return resp.body, nil
+}
+
+// fetchPrometheus performs a GET against the Prometheus API, optionally conditional on the
+// given validators. Identical requests made while one is already in flight share its
+// result instead of hitting Prometheus again.
+func fetchPrometheus(ctx context.Context, fullURL, etag, lastModified string) (*prometheusResponse, error) {
+	key := fmt.Sprintf("%p %s %s %s", getHTTPClient(ctx), fullURL, etag, lastModified)
+	call := joinInflight(ctx, key)
+	defer leaveInflight(key, call)
+	ch := inflight.DoChan(key, func() (interface{}, error) {
+		return doGetPrometheus(call.ctx, fullURL, etag, lastModified)
+	})
+
+	select {
+	case res := <-ch:
+		if res.Err != nil {
+			return nil, res.Err
+		}
+		return res.Val.(*prometheusResponse), nil
+	case <-ctx.Done():
+		return nil, fmt.Errorf("failed to query Prometheus: %w", ctx.Err())
+	}
+}
+
+func doGetPrometheus(ctx context.Context, fullURL, etag, lastModified string) (*prometheusResponse, error) {
+	req, err := http.NewRequestWithContext(ctx, http.MethodGet, fullURL, nil)
+	if err != nil {
+		return nil, fmt.Errorf("failed to query Prometheus: %w", err)
+	}
+	if etag != "" {
+		req.Header.Set("If-None-Match", etag)
+	}
+	if lastModified != "" {
+		req.Header.Set("If-Modified-Since", lastModified)
+	}
+
+	resp, err := getHTTPClient(ctx).Do(req)
+	if err != nil {
+		return nil, fmt.Errorf("failed to query Prometheus: %w", err)
 	}
 	defer resp.Body.Close()
 
-	body, err := io.ReadAll(resp.Body)
+	body, err := readResponseBody(resp)
 	if err != nil {
-		return mcp.NewToolResultError("failed to read response: " + err.Error()), nil
+		return nil, fmt.Errorf("failed to read response: %w", err)
 	}
 
-	if resp.StatusCode != http.StatusOK {
-		return mcp.NewToolResultError(fmt.Sprintf("Prometheus API error (%d): %s", resp.StatusCode, string(body))), nil
+	result := &prometheusResponse{
+		etag:         resp.Header.Get("ETag"),
+		lastModified: resp.Header.Get("Last-Modified"),
 	}
+	switch {
+	case resp.StatusCode == http.StatusNotModified && (etag != "" || lastModified != ""):
+		result.notModified = true
+	case resp.StatusCode != http.StatusOK:
+		return nil, fmt.Errorf("Prometheus API error (%d): %s", resp.StatusCode, string(body))
+	default:
+		result.body = body
+	}
+	return result, nil
+}
 
-	// Parse the JSON response to pretty-print it
-	var result interface{}
-	if err := json.Unmarshal(body, &result); err != nil {
-		return mcp.NewToolResultText(string(body)), nil
+// Prometheus tools using direct HTTP API calls
+
+func handlePrometheusQueryTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+	prometheusURL := getPrometheusURL(request)
+	query := mcp.ParseString(request, "query", "")
+
+	if query == "" {
+		return mcp.NewToolResultError("query parameter is required"), nil
 	}
 
-	prettyJSON, err := json.MarshalIndent(result, "", "  ")
+	// Make request to Prometheus API
+	apiURL := prometheusURL + "/api/v1/query"
+	body, err := getPrometheus(ctx, instantQueryURL(apiURL, query, formatUnixTime(time.Now())))
 	if err != nil {
-		return mcp.NewToolResultText(string(body)), nil
+		return mcp.NewToolResultError(err.Error()), nil
 	}
 
-	return mcp.NewToolResultText(string(prettyJSON)), nil
+	return mcp.NewToolResultText(prettyJSON(body)), nil
 }
 
 func handlePrometheusRangeQueryTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
-	prometheusURL := mcp.ParseString(request, "prometheus_url", "http://localhost:9090")
+	prometheusURL := getPrometheusURL(request)
 	query := mcp.ParseString(request, "query", "")
 	start := mcp.ParseString(request, "start", "")
 	end := mcp.ParseString(request, "end", "")
@@ -82,12 +276,16 @@ func handlePrometheusRangeQueryTool(ctx context.Context, request mcp.CallToolReq
 		return mcp.NewToolResultError("query parameter is required"), nil
 	}
 
-	// Use default time range if not specified
-	if start == "" {
-		start = fmt.Sprintf("%d", time.Now().Add(-1*time.Hour).Unix())
-	}
-	if end == "" {
-		end = fmt.Sprintf("%d", time.Now().Unix())
+	// Use default time range if not specified, reading the clock once so the
+	// default window is exactly one hour
+	if start == "" || end == "" {
+		now := time.Now()
+		if start == "" {
+			start = formatUnixTime(now.Add(-1 * time.Hour))
+		}
+		if end == "" {
+			end = formatUnixTime(now)
+		}
 	}
 
 	// Make request to Prometheus API
@@ -100,113 +298,227 @@ func handlePrometheusRangeQueryTool(ctx context.Context, request mcp.CallToolReq
 
 	fullURL := fmt.Sprintf("%s?%s", apiURL, params.Encode())
 
-	client := getHTTPClient(ctx)
-	resp, err := client.Get(fullURL)
+	body, err := getPrometheus(ctx, fullURL)
 	if err != nil {
-		return mcp.NewToolResultError("failed to query Prometheus: " + err.Error()), nil
+		return mcp.NewToolResultError(err.Error()), nil
 	}
-	defer resp.Body.Close()
 
-	body, err := io.ReadAll(resp.Body)
-	if err != nil {
-		return mcp.NewToolResultError("failed to read response: " + err.Error()), nil
-	}
+	return mcp.NewToolResultText(prettyJSON(body)), nil
+}
 
-	if resp.StatusCode != http.StatusOK {
-		return mcp.NewToolResultError(fmt.Sprintf("Prometheus API error (%d): %s", resp.StatusCode, string(body))), nil
-	}
+func handlePrometheusLabelsQueryTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+	prometheusURL := getPrometheusURL(request)
 
-	// Parse the JSON response to pretty-print it
-	var result interface{}
-	if err := json.Unmarshal(body, &result); err != nil {
-		return mcp.NewToolResultText(string(body)), nil
-	}
+	// Make request to Prometheus API for labels
+	apiURL := fmt.Sprintf("%s/api/v1/labels", prometheusURL)
 
-	prettyJSON, err := json.MarshalIndent(result, "", "  ")
+	body, err := getPrometheusCached(ctx, apiURL, labelsCacheTTL)
 	if err != nil {
-		return mcp.NewToolResultText(string(body)), nil
+		return mcp.NewToolResultError(err.Error()), nil
 	}
 
-	return mcp.NewToolResultText(string(prettyJSON)), nil
+	return mcp.NewToolResultText(prettyJSON(body)), nil
 }
 
-func handlePrometheusLabelsQueryTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
-	prometheusURL := mcp.ParseString(request, "prometheus_url", "http://localhost:9090")
+func handlePrometheusTargetsQueryTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+	prometheusURL := getPrometheusURL(request)
 
-	// Make request to Prometheus API for labels
-	apiURL := fmt.Sprintf("%s/api/v1/labels", prometheusURL)
+	// Make request to Prometheus API for targets
+	apiURL := fmt.Sprintf("%s/api/v1/targets", prometheusURL)
 
-	client := getHTTPClient(ctx)
-	resp, err := client.Get(apiURL)
+	body, err := getPrometheusCached(ctx, apiURL, targetsCacheTTL)
 	if err != nil {
-		return mcp.NewToolResultError("failed to query Prometheus: " + err.Error()), nil
+		return mcp.NewToolResultError(err.Error()), nil
 	}
-	defer resp.Body.Close()
 
-	body, err := io.ReadAll(resp.Body)
-	if err != nil {
-		return mcp.NewToolResultError("failed to read response: " + err.Error()), nil
-	}
+	return mcp.NewToolResultText(prettyJSON(body)), nil
+}
 
-	if resp.StatusCode != http.StatusOK {
-		return mcp.NewToolResultError(fmt.Sprintf("Prometheus API error (%d): %s", resp.StatusCode, string(body))), nil
-	}
+// splitList splits a delimited tool parameter into its trimmed, non-empty, unique entries
+func splitList(value, sep string) []string {
+	return uniqueItems(strings.Split(value, sep))
+}
 
-	// Parse the JSON response to pretty-print it
-	var result interface{}
-	if err := json.Unmarshal(body, &result); err != nil {
-		return mcp.NewToolResultText(string(body)), nil
+// uniqueItems returns the trimmed, non-empty entries of items without duplicates, in order
+func uniqueItems(items []string) []string {
+	var unique []string
+	seen := map[string]bool{}
+	for _, item := range items {
+		item = strings.TrimSpace(item)
+		if item == "" || seen[item] {
+			continue
+		}
+		seen[item] = true
+		unique = append(unique, item)
 	}
+	return unique
+}
 
-	prettyJSON, err := json.MarshalIndent(result, "", "  ")
-	if err != nil {
-		return mcp.NewToolResultText(string(body)), nil
+// parseQueries reads the queries parameter of prometheus_query_batch_tool. It is a list of
+// queries, each of which may span several lines. Clients that send a string instead may pass
+// a JSON array, or single-line queries separated by newlines.
+func parseQueries(value any) []string {
+	switch v := value.(type) {
+	case []any:
+		queries := make([]string, 0, len(v))
+		for _, item := range v {
+			if query, ok := item.(string); ok {
+				queries = append(queries, query)
+			}
+		}
+		return uniqueItems(queries)
+	case []string:
+		return uniqueItems(v)
+	case string:
+		// PromQL cannot start with '[', so this is unambiguous
+		var queries []string
+		if strings.HasPrefix(strings.TrimSpace(v), "[") && json.Unmarshal([]byte(v), &queries) == nil {
+			return uniqueItems(queries)
+		}
+		return splitList(v, "\n")
 	}
-
-	return mcp.NewToolResultText(string(prettyJSON)), nil
+	return nil
 }
 
-func handlePrometheusTargetsQueryTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
-	prometheusURL := mcp.ParseString(request, "prometheus_url", "http://localhost:9090")
+// fanOutLimit caps how many fan-out requests all tool calls together may have
+// outstanding against Prometheus, so a large batch cannot flood the server.
+const fanOutLimit = 16
 
-	// Make request to Prometheus API for targets
-	apiURL := fmt.Sprintf("%s/api/v1/targets", prometheusURL)
+var fanOutSlots = make(chan struct{}, fanOutLimit)
 
-	client := getHTTPClient(ctx)
-	resp, err := client.Get(apiURL)
-	if err != nil {
-		return mcp.NewToolResultError("failed to query Prometheus: " + err.Error()), nil
+// fetchLimited runs fetch once a fan-out slot is free, giving up if ctx is done first
+func fetchLimited(ctx context.Context, key string, fetch func(ctx context.Context, key string) ([]byte, error)) ([]byte, error) {
+	select {
+	case fanOutSlots <- struct{}{}:
+	case <-ctx.Done():
+		return nil, fmt.Errorf("failed to query Prometheus: %w", ctx.Err())
 	}
-	defer resp.Body.Close()
+	defer func() { <-fanOutSlots }()
+	return fetch(ctx, key)
+}
 
-	body, err := io.ReadAll(resp.Body)
-	if err != nil {
-		return mcp.NewToolResultError("failed to read response: " + err.Error()), nil
+// fetchEach calls fetch for every key concurrently over the shared client and returns the
+// bodies in the same order. A failure does not cancel the others; it is reported in place
+// as an error in the Prometheus response format.
+func fetchEach(ctx context.Context, keys []string, fetch func(ctx context.Context, key string) ([]byte, error)) [][]byte {
+	var wg sync.WaitGroup
+	bodies := make([][]byte, len(keys))
+	for i, key := range keys {
+		wg.Add(1)
+		go func(i int, key string) {
+			defer wg.Done()
+			body, err := fetchLimited(ctx, key, fetch)
+			if err != nil {
+				body, _ = json.Marshal(map[string]string{"status": "error", "error": err.Error()})
+			}
+			bodies[i] = body
+		}(i, key)
 	}
+	wg.Wait()
+	return bodies
+}
 
-	if resp.StatusCode != http.StatusOK {
-		return mcp.NewToolResultError(fmt.Sprintf("Prometheus API error (%d): %s", resp.StatusCode, string(body))), nil
+// keyedResult combines per-key JSON responses into a single object keyed by the key
+func keyedResult(keys []string, bodies [][]byte) *mcp.CallToolResult {
+	results := make(map[string]json.RawMessage, len(keys))
+	for i, key := range keys {
+		body := bodies[i]
+		if !json.Valid(body) {
+			// Keep non-JSON responses as strings rather than failing the whole result
+			body, _ = json.Marshal(string(body))
+		}
+		results[key] = body
+	}
+	combined, err := json.Marshal(results)
+	if err != nil {
+		return mcp.NewToolResultError("failed to encode results: " + err.Error())
 	}
+	return mcp.NewToolResultText(prettyJSON(combined))
+}
+
+func handlePrometheusQueryBatchTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+	prometheusURL := getPrometheusURL(request)
+	queries := parseQueries(request.GetArguments()["queries"])
 
-	// Parse the JSON response to pretty-print it
-	var result interface{}
-	if err := json.Unmarshal(body, &result); err != nil {
-		return mcp.NewToolResultText(string(body)), nil
+	if len(queries) == 0 {
+		return mcp.NewToolResultError("queries parameter is required"), nil
 	}
 
-	prettyJSON, err := json.MarshalIndent(result, "", "  ")
-	if err != nil {
-		return mcp.NewToolResultText(string(body)), nil
+	// All queries are evaluated at the same instant so their results line up
+	apiURL := fmt.Sprintf("%s/api/v1/query", prometheusURL)
+	ts := formatUnixTime(time.Now())
+	// A bad query is reported in place so it does not hide the results of the others
+	bodies := fetchEach(ctx, queries, func(ctx context.Context, query string) ([]byte, error) {
+		return getPrometheus(ctx, instantQueryURL(apiURL, query, ts))
+	})
+
+	return keyedResult(queries, bodies), nil
+}
+
+func handlePrometheusLabelValuesTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+	prometheusURL := getPrometheusURL(request)
+	labelNames := splitList(mcp.ParseString(request, "label_names", ""), ",")
+
+	if len(labelNames) == 0 {
+		return mcp.NewToolResultError("label_names parameter is required"), nil
 	}
 
-	return mcp.NewToolResultText(string(prettyJSON)), nil
+	// An unknown or failing label is reported in place so it does not hide the values of the others
+	bodies := fetchEach(ctx, labelNames, func(ctx context.Context, labelName string) ([]byte, error) {
+		apiURL := fmt.Sprintf("%s/api/v1/label/%s/values", prometheusURL, url.PathEscape(labelName))
+		body, err := getPrometheusCached(ctx, apiURL, labelsCacheTTL)
+		if err != nil {
+			return nil, err
+		}
+		// Only the values are useful here, so drop the envelope
+		return extractData(body)
+	})
+
+	return keyedResult(labelNames, bodies), nil
+}
+
+// prometheusStatusEndpoints are the API paths summarized by prometheus_status_tool
+var prometheusStatusEndpoints = []string{
+	"status/buildinfo",
+	"status/runtimeinfo",
+	"status/flags",
+	"status/config",
+	"status/tsdb",
+	"status/walreplay",
+	"alertmanagers",
+}
+
+// staticStatusEndpoints only change when Prometheus restarts or reloads its configuration
+var staticStatusEndpoints = map[string]bool{
+	"status/buildinfo": true,
+	"status/flags":     true,
+	"status/config":    true,
+}
+
+func handlePrometheusStatusTool(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+	prometheusURL := getPrometheusURL(request)
+	forceRefresh := mcp.ParseString(request, "force_refresh", "") == "true"
+
+	// The endpoints are independent, so fetch them all at once and report failures per endpoint
+	bodies := fetchEach(ctx, prometheusStatusEndpoints, func(ctx context.Context, endpoint string) ([]byte, error) {
+		apiURL := fmt.Sprintf("%s/api/v1/%s", prometheusURL, endpoint)
+		if !staticStatusEndpoints[endpoint] {
+			return getPrometheus(ctx, apiURL)
+		}
+		if forceRefresh {
+			invalidateCached(ctx, apiURL)
+		}
+		return getPrometheusCached(ctx, apiURL, staticStatusCacheTTL)
+	})
+
+	return keyedResult(prometheusStatusEndpoints, bodies), nil
 }
 
 func RegisterPrometheusTools(s *server.MCPServer) {
 	s.AddTool(mcp.NewTool("prometheus_query_tool",
 		mcp.WithDescription("Execute a PromQL query against Prometheus"),
 		mcp.WithString("query", mcp.Description("PromQL query to execute"), mcp.Required()),
-		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: http://localhost:9090)")),
+		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: $PROMETHEUS_URL or http://localhost:9090)")),
 	), handlePrometheusQueryTool)
 
 	s.AddTool(mcp.NewTool("prometheus_query_range_tool",
@@ -215,19 +527,37 @@ func RegisterPrometheusTools(s *server.MCPServer) {
 		mcp.WithString("start", mcp.Description("Start time (Unix timestamp or relative time)")),
 		mcp.WithString("end", mcp.Description("End time (Unix timestamp or relative time)")),
 		mcp.WithString("step", mcp.Description("Query resolution step (default: 15s)")),
-		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: http://localhost:9090)")),
+		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: $PROMETHEUS_URL or http://localhost:9090)")),
 	), handlePrometheusRangeQueryTool)
 
+	s.AddTool(mcp.NewTool("prometheus_query_batch_tool",
+		mcp.WithDescription("Execute several PromQL queries concurrently against Prometheus, returning the result or error of each keyed by query"),
+		mcp.WithArray("queries", mcp.WithStringItems(), mcp.Description("PromQL queries to execute, one per item; a query may span multiple lines"), mcp.Required()),
+		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: $PROMETHEUS_URL or http://localhost:9090)")),
+	), handlePrometheusQueryBatchTool)
+
 	s.AddTool(mcp.NewTool("prometheus_label_names_tool",
 		mcp.WithDescription("Get all available labels from Prometheus"),
-		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: http://localhost:9090)")),
+		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: $PROMETHEUS_URL or http://localhost:9090)")),
 	), handlePrometheusLabelsQueryTool)
 
+	s.AddTool(mcp.NewTool("prometheus_label_values_tool",
+		mcp.WithDescription("Get the values of one or more labels from Prometheus as lists keyed by label name, with the error in place of the values for a label that fails"),
+		mcp.WithString("label_names", mcp.Description("Comma-separated list of label names"), mcp.Required()),
+		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: $PROMETHEUS_URL or http://localhost:9090)")),
+	), handlePrometheusLabelValuesTool)
+
 	s.AddTool(mcp.NewTool("prometheus_targets_tool",
 		mcp.WithDescription("Get all Prometheus targets and their status"),
-		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: http://localhost:9090)")),
+		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: $PROMETHEUS_URL or http://localhost:9090)")),
 	), handlePrometheusTargetsQueryTool)
 
+	s.AddTool(mcp.NewTool("prometheus_status_tool",
+		mcp.WithDescription("Get Prometheus server status: build and runtime info, flags, configuration, TSDB stats, WAL replay and alertmanagers"),
+		mcp.WithString("force_refresh", mcp.Description("Refetch build info, flags and configuration instead of using cached values (true/false)")),
+		mcp.WithString("prometheus_url", mcp.Description("Prometheus server URL (default: $PROMETHEUS_URL or http://localhost:9090)")),
+	), handlePrometheusStatusTool)
+
 	s.AddTool(mcp.NewTool("prometheus_promql_tool",
 		mcp.WithDescription("Generate a PromQL query"),
 		mcp.WithString("query_description", mcp.Description("A string describing the query to generate"), mcp.Required()),
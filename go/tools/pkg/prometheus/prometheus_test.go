@@ -1,7 +1,23 @@
 package prometheus
 
 import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"io"
 	"net/http"
+	"net/http/httptest"
+	"net/url"
+	"strconv"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/mark3labs/mcp-go/mcp"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
 )
 
 // mockRoundTripper is used to mock HTTP responses for testing
@@ -25,3 +41,426 @@ func newTestClient(response *http.Response, err error) *http.Client {
 		},
 	}
 }
+
+func TestPrettyJSON(t *testing.T) {
+	body := []byte(`{"status":"success","data":{"resultType":"vector","result":[]}}`)
+	expected := "{\n  \"status\": \"success\",\n  \"data\": {\n    \"resultType\": \"vector\",\n    \"result\": []\n  }\n}"
+	assert.Equal(t, expected, prettyJSON(body))
+
+	assert.Equal(t, "not json", prettyJSON([]byte("not json")))
+}
+
+func TestReadResponseBody(t *testing.T) {
+	body := `{"status":"success"}`
+	resp := &http.Response{
+		ContentLength: int64(len(body)),
+		Body:          io.NopCloser(strings.NewReader(body)),
+	}
+	data, err := readResponseBody(resp)
+	assert.NoError(t, err)
+	assert.Equal(t, body, string(data))
+
+	// Chunked or compressed responses report an unknown length
+	resp = &http.Response{
+		ContentLength: -1,
+		Body:          io.NopCloser(strings.NewReader(body)),
+	}
+	data, err = readResponseBody(resp)
+	assert.NoError(t, err)
+	assert.Equal(t, body, string(data))
+
+	// A bogus length must not be allocated up front
+	resp = &http.Response{
+		ContentLength: 1 << 62,
+		Body:          io.NopCloser(strings.NewReader(body)),
+	}
+	data, err = readResponseBody(resp)
+	assert.NoError(t, err)
+	assert.Equal(t, body, string(data))
+	assert.LessOrEqual(t, cap(data), maxBodyPrealloc+bytes.MinRead)
+
+	// A body of exactly the reported length is read without reallocating the buffer
+	for size := 1000; size < 64*1024; size += 997 {
+		body := strings.Repeat("x", size)
+		data, err := readResponseBody(&http.Response{
+			ContentLength: int64(size),
+			Body:          io.NopCloser(strings.NewReader(body)),
+		})
+		require.NoError(t, err)
+		require.Equal(t, size, len(data))
+		if cap(data) >= 2*(size+bytes.MinRead) {
+			t.Fatalf("buffer for a %d byte body was reallocated to %d", size, cap(data))
+		}
+	}
+}
+
+func TestFormatUnixTime(t *testing.T) {
+	assert.Equal(t, "1700000000", formatUnixTime(time.Unix(1700000000, 500)))
+}
+
+func TestHandlePrometheusQueryBatchTool(t *testing.T) {
+	server := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		query := r.URL.Query().Get("query")
+		if query == "bad" {
+			w.WriteHeader(http.StatusBadRequest)
+			_, _ = w.Write([]byte(`{"status":"error","error":"parse error"}`))
+			return
+		}
+		quoted, _ := json.Marshal(query)
+		_, _ = w.Write([]byte(`{"status":"success","data":{"query":` + string(quoted) + `}}`))
+	}))
+	defer server.Close()
+
+	t.Run("concurrent queries", func(t *testing.T) {
+		multiLine := "sum by (job) (\n  rate(http_requests_total[5m])\n)"
+		request := mcp.CallToolRequest{}
+		request.Params.Arguments = map[string]interface{}{
+			"prometheus_url": server.URL,
+			"queries":        []interface{}{"up", multiLine, " ", "up"},
+		}
+
+		result, err := handlePrometheusQueryBatchTool(context.Background(), request)
+		require.NoError(t, err)
+		require.False(t, result.IsError)
+
+		// A multi-line query stays a single query
+		var results map[string]map[string]interface{}
+		require.NoError(t, json.Unmarshal([]byte(result.Content[0].(mcp.TextContent).Text), &results))
+		assert.Len(t, results, 2)
+		assert.Equal(t, "success", results["up"]["status"])
+		assert.Equal(t, "success", results[multiLine]["status"])
+	})
+
+	t.Run("queries as a string", func(t *testing.T) {
+		for _, queries := range []string{
+			"up\nrate(http_requests_total[5m])\n\nup",
+			`["up", "rate(http_requests_total[5m])"]`,
+		} {
+			request := mcp.CallToolRequest{}
+			request.Params.Arguments = map[string]interface{}{
+				"prometheus_url": server.URL,
+				"queries":        queries,
+			}
+
+			result, err := handlePrometheusQueryBatchTool(context.Background(), request)
+			require.NoError(t, err)
+			require.False(t, result.IsError)
+
+			var results map[string]map[string]interface{}
+			require.NoError(t, json.Unmarshal([]byte(result.Content[0].(mcp.TextContent).Text), &results))
+			assert.Len(t, results, 2)
+			assert.Equal(t, "success", results["up"]["status"])
+			assert.Equal(t, "success", results["rate(http_requests_total[5m])"]["status"])
+		}
+	})
+
+	t.Run("failing query", func(t *testing.T) {
+		request := mcp.CallToolRequest{}
+		request.Params.Arguments = map[string]interface{}{
+			"prometheus_url": server.URL,
+			"queries":        []interface{}{"up", "bad"},
+		}
+
+		result, err := handlePrometheusQueryBatchTool(context.Background(), request)
+		require.NoError(t, err)
+		require.False(t, result.IsError)
+
+		// The failure is reported for its query only
+		var results map[string]map[string]interface{}
+		require.NoError(t, json.Unmarshal([]byte(result.Content[0].(mcp.TextContent).Text), &results))
+		assert.Equal(t, "success", results["up"]["status"])
+		assert.Equal(t, "error", results["bad"]["status"])
+		assert.Contains(t, results["bad"]["error"], "parse error")
+	})
+
+	t.Run("missing queries", func(t *testing.T) {
+		result, err := handlePrometheusQueryBatchTool(context.Background(), mcp.CallToolRequest{})
+		require.NoError(t, err)
+		assert.True(t, result.IsError)
+	})
+}
+
+func TestHandlePrometheusLabelsQueryTool(t *testing.T) {
+	t.Run("success", func(t *testing.T) {
+		client := newTestClient(&http.Response{
+			StatusCode: http.StatusOK,
+			Body:       io.NopCloser(strings.NewReader(`{"status":"success","data":["__name__","job"]}`)),
+		}, nil)
+		ctx := context.WithValue(context.Background(), clientKey{}, client)
+
+		result, err := handlePrometheusLabelsQueryTool(ctx, mcp.CallToolRequest{})
+		require.NoError(t, err)
+		assert.False(t, result.IsError)
+		assert.Contains(t, result.Content[0].(mcp.TextContent).Text, `"job"`)
+	})
+
+	t.Run("api error", func(t *testing.T) {
+		client := newTestClient(&http.Response{
+			StatusCode: http.StatusServiceUnavailable,
+			Body:       io.NopCloser(strings.NewReader("unavailable")),
+		}, nil)
+		ctx := context.WithValue(context.Background(), clientKey{}, client)
+
+		result, err := handlePrometheusLabelsQueryTool(ctx, mcp.CallToolRequest{})
+		require.NoError(t, err)
+		assert.True(t, result.IsError)
+		assert.Contains(t, result.Content[0].(mcp.TextContent).Text, "Prometheus API error (503): unavailable")
+	})
+
+	t.Run("transport error", func(t *testing.T) {
+		ctx := context.WithValue(context.Background(), clientKey{}, newTestClient(nil, assert.AnError))
+
+		result, err := handlePrometheusLabelsQueryTool(ctx, mcp.CallToolRequest{})
+		require.NoError(t, err)
+		assert.True(t, result.IsError)
+		assert.Contains(t, result.Content[0].(mcp.TextContent).Text, "failed to query Prometheus")
+	})
+}
+
+func TestHandlePrometheusLabelValuesTool(t *testing.T) {
+	server := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		switch r.URL.Path {
+		case "/api/v1/label/job/values":
+			_, _ = w.Write([]byte(`{"status":"success","data":["prometheus","node"]}`))
+		case "/api/v1/label/namespace/values":
+			_, _ = w.Write([]byte(`{"status":"success","data":["default","kube-system"]}`))
+		default:
+			w.WriteHeader(http.StatusNotFound)
+			_, _ = w.Write([]byte("not found"))
+		}
+	}))
+	defer server.Close()
+
+	t.Run("success", func(t *testing.T) {
+		request := mcp.CallToolRequest{}
+		request.Params.Arguments = map[string]interface{}{
+			"prometheus_url": server.URL,
+			"label_names":    "job, namespace,",
+		}
+
+		result, err := handlePrometheusLabelValuesTool(context.Background(), request)
+		require.NoError(t, err)
+		require.False(t, result.IsError)
+
+		var results map[string][]string
+		require.NoError(t, json.Unmarshal([]byte(result.Content[0].(mcp.TextContent).Text), &results))
+		assert.Equal(t, []string{"prometheus", "node"}, results["job"])
+		assert.Equal(t, []string{"default", "kube-system"}, results["namespace"])
+	})
+
+	t.Run("failing label", func(t *testing.T) {
+		request := mcp.CallToolRequest{}
+		request.Params.Arguments = map[string]interface{}{
+			"prometheus_url": server.URL,
+			"label_names":    "job,missing",
+		}
+
+		result, err := handlePrometheusLabelValuesTool(context.Background(), request)
+		require.NoError(t, err)
+		require.False(t, result.IsError)
+
+		// The failure is reported for its label only
+		var results map[string]json.RawMessage
+		require.NoError(t, json.Unmarshal([]byte(result.Content[0].(mcp.TextContent).Text), &results))
+		var values []string
+		require.NoError(t, json.Unmarshal(results["job"], &values))
+		assert.Equal(t, []string{"prometheus", "node"}, values)
+		var failure map[string]string
+		require.NoError(t, json.Unmarshal(results["missing"], &failure))
+		assert.Equal(t, "error", failure["status"])
+		assert.Contains(t, failure["error"], "Prometheus API error (404)")
+	})
+
+	t.Run("missing label names", func(t *testing.T) {
+		result, err := handlePrometheusLabelValuesTool(context.Background(), mcp.CallToolRequest{})
+		require.NoError(t, err)
+		assert.True(t, result.IsError)
+	})
+}
+
+func TestHandlePrometheusStatusTool(t *testing.T) {
+	var calls int32
+	server := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		atomic.AddInt32(&calls, 1)
+		if r.URL.Path == "/api/v1/status/walreplay" {
+			w.WriteHeader(http.StatusNotFound)
+			_, _ = w.Write([]byte("404 page not found"))
+			return
+		}
+		_, _ = w.Write([]byte(`{"status":"success","data":{"path":"` + r.URL.Path + `"}}`))
+	}))
+	defer server.Close()
+
+	request := mcp.CallToolRequest{}
+	request.Params.Arguments = map[string]interface{}{
+		"prometheus_url": server.URL,
+	}
+
+	result, err := handlePrometheusStatusTool(context.Background(), request)
+	require.NoError(t, err)
+	require.False(t, result.IsError)
+
+	var results map[string]map[string]interface{}
+	require.NoError(t, json.Unmarshal([]byte(result.Content[0].(mcp.TextContent).Text), &results))
+	assert.Len(t, results, len(prometheusStatusEndpoints))
+	assert.Equal(t, "success", results["status/buildinfo"]["status"])
+	assert.Equal(t, "success", results["alertmanagers"]["status"])
+
+	// A failing endpoint is reported in place without failing the others
+	assert.Equal(t, "error", results["status/walreplay"]["status"])
+	assert.Contains(t, results["status/walreplay"]["error"], "404")
+	// Build info, flags and config are served from the cache unless a refresh is forced
+	assert.Equal(t, int32(len(prometheusStatusEndpoints)), atomic.LoadInt32(&calls))
+	_, err = handlePrometheusStatusTool(context.Background(), request)
+	require.NoError(t, err)
+	assert.Equal(t, int32(2*len(prometheusStatusEndpoints)-len(staticStatusEndpoints)), atomic.LoadInt32(&calls))
+
+	request.Params.Arguments = map[string]interface{}{
+		"prometheus_url": server.URL,
+		"force_refresh":  "true",
+	}
+	_, err = handlePrometheusStatusTool(context.Background(), request)
+	require.NoError(t, err)
+	assert.Equal(t, int32(3*len(prometheusStatusEndpoints)-len(staticStatusEndpoints)), atomic.LoadInt32(&calls))
+}
+
+func TestInstantQueryURL(t *testing.T) {
+	query := `sum(rate(http_requests_total{job="api", code=~"5.."}[5m])) / 2 + 1`
+	params := url.Values{}
+	params.Add("query", query)
+	params.Add("time", "1700000000")
+
+	assert.Equal(t, "http://localhost:9090/api/v1/query?"+params.Encode(),
+		instantQueryURL("http://localhost:9090/api/v1/query", query, "1700000000"))
+}
+
+func TestGetPrometheusSingleFlight(t *testing.T) {
+	var calls int32
+	release := make(chan struct{})
+	server := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		atomic.AddInt32(&calls, 1)
+		<-release
+		_, _ = w.Write([]byte(`{"status":"success","data":{"result":[]}}`))
+	}))
+	defer server.Close()
+
+	ctx := context.WithValue(context.Background(), clientKey{}, server.Client())
+	fullURL := instantQueryURL(server.URL+"/api/v1/query", "up", "1700000000")
+
+	const callers = 5
+	var wg sync.WaitGroup
+	bodies := make([][]byte, callers)
+	errs := make([]error, callers)
+	for i := 0; i < callers; i++ {
+		wg.Add(1)
+		go func(i int) {
+			defer wg.Done()
+			bodies[i], errs[i] = getPrometheus(ctx, fullURL)
+		}(i)
+	}
+
+	// Give every caller time to join the in-flight request before it completes
+	time.Sleep(50 * time.Millisecond)
+	close(release)
+	wg.Wait()
+
+	assert.Equal(t, int32(1), atomic.LoadInt32(&calls))
+	for i := 0; i < callers; i++ {
+		require.NoError(t, errs[i])
+		assert.Contains(t, string(bodies[i]), "success")
+	}
+}
+
+func TestGetPrometheusSingleFlightCancellation(t *testing.T) {
+	cancelled := make(chan struct{})
+	release := make(chan struct{})
+	server := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		if r.URL.Query().Get("query") == "abandoned" {
+			<-r.Context().Done()
+			close(cancelled)
+			return
+		}
+		<-release
+		_, _ = w.Write([]byte(`{"status":"success","data":{"result":[]}}`))
+	}))
+	defer server.Close()
+
+	baseCtx := context.WithValue(context.Background(), clientKey{}, server.Client())
+
+	// A request nobody waits on any more is cancelled upstream
+	ctx, cancel := context.WithCancel(baseCtx)
+	go func() {
+		time.Sleep(20 * time.Millisecond)
+		cancel()
+	}()
+	_, err := getPrometheus(ctx, instantQueryURL(server.URL+"/api/v1/query", "abandoned", "1700000000"))
+	require.Error(t, err)
+	select {
+	case <-cancelled:
+	case <-time.After(5 * time.Second):
+		t.Fatal("abandoned request was not cancelled")
+	}
+
+	// One caller giving up does not fail the others sharing the request
+	fullURL := instantQueryURL(server.URL+"/api/v1/query", "shared", "1700000000")
+	leavingCtx, leave := context.WithCancel(baseCtx)
+	leftErr := make(chan error, 1)
+	go func() {
+		_, err := getPrometheus(leavingCtx, fullURL)
+		leftErr <- err
+	}()
+	stayed := make(chan error, 1)
+	go func() {
+		_, err := getPrometheus(baseCtx, fullURL)
+		stayed <- err
+	}()
+	time.Sleep(20 * time.Millisecond)
+	leave()
+	require.Error(t, <-leftErr)
+	close(release)
+	require.NoError(t, <-stayed)
+}
+
+func TestFetchEachLimit(t *testing.T) {
+	var active, peak int32
+	keys := make([]string, fanOutLimit*3)
+	for i := range keys {
+		keys[i] = strconv.Itoa(i)
+	}
+
+	bodies := fetchEach(context.Background(), keys, func(ctx context.Context, key string) ([]byte, error) {
+		n := atomic.AddInt32(&active, 1)
+		for {
+			p := atomic.LoadInt32(&peak)
+			if n <= p || atomic.CompareAndSwapInt32(&peak, p, n) {
+				break
+			}
+		}
+		time.Sleep(time.Millisecond)
+		atomic.AddInt32(&active, -1)
+		return []byte(key), nil
+	})
+	assert.Equal(t, "7", string(bodies[7]))
+	assert.LessOrEqual(t, int(atomic.LoadInt32(&peak)), fanOutLimit)
+}
+
+func TestGetPrometheusURL(t *testing.T) {
+	assert.Equal(t, defaultPrometheusURL, getPrometheusURL(mcp.CallToolRequest{}))
+
+	request := mcp.CallToolRequest{}
+	request.Params.Arguments = map[string]interface{}{
+		"prometheus_url": "http://prometheus.monitoring:9090/",
+	}
+	assert.Equal(t, "http://prometheus.monitoring:9090", getPrometheusURL(request))
+
+	assert.Equal(t, "http://localhost:9090", normalizePrometheusURL(" ", "http://localhost:9090"))
+}
+
+func TestExtractData(t *testing.T) {
+	data, err := extractData([]byte(`{"status":"success","data":["a","b"],"warnings":["slow"]}`))
+	require.NoError(t, err)
+	assert.Equal(t, `["a","b"]`, string(data))
+
+	_, err = extractData([]byte("not json"))
+	assert.Error(t, err)
+}
@@ -2,35 +2,119 @@ package prometheus
 
 import (
 	"context"
+	"crypto/sha256"
 	_ "embed"
+	"encoding/hex"
+	"strings"
+	"sync"
+	"time"
 
+	"github.com/kagent-dev/kagent/go/tools/pkg/utils"
 	"github.com/mark3labs/mcp-go/mcp"
 	"github.com/tmc/langchaingo/llms"
-	"github.com/tmc/langchaingo/llms/openai"
 )
 
 //go:embed promql_prompt.md
 var promqlPrompt string
 
+// promqlModel is pinned to a dated snapshot so that prompt caching behaves the same from
+// one request to the next. The static system prompt is about 1.2k tokens, only just over
+// the 1024 token caching minimum; TestPromqlPromptCacheable fails if an edit drops it too
+// close. Bump the pin when OpenAI retires this snapshot.
+const promqlModel = "gpt-4o-mini-2024-07-18"
+
+// promqlSystemMessage is built once so every request starts with a byte-identical prefix.
+// Anything that varies per call belongs in the trailing human message.
+var promqlSystemMessage = llms.MessageContent{
+	Role: llms.ChatMessageTypeSystem,
+	Parts: []llms.ContentPart{
+		llms.TextContent{Text: promqlPrompt},
+	},
+}
+
+// promqlCacheSize bounds the number of generated queries kept in memory
+const promqlCacheSize = 256
+
+// promqlCacheTTL bounds how long a generated query is reused, so prompt or model
+// behaviour changes on the provider side are picked up eventually
+const promqlCacheTTL = time.Hour
+
+// promqlCache holds generated queries keyed by model, prompt and the whitespace-normalized
+// description, so repeated requests skip the LLM round trip entirely.
+type promqlCache struct {
+	mu      sync.Mutex
+	entries map[string]promqlCacheEntry
+}
+
+type promqlCacheEntry struct {
+	query   string
+	expires time.Time
+}
+
+var promqlResponses = &promqlCache{entries: map[string]promqlCacheEntry{}}
+
+// promqlCacheKey only collapses whitespace; case is kept because metric names and
+// label values in the description are case-sensitive.
+func promqlCacheKey(queryDescription string) string {
+	normalized := strings.Join(strings.Fields(queryDescription), " ")
+	h := sha256.New()
+	h.Write([]byte(promqlModel))
+	h.Write([]byte{0})
+	h.Write([]byte(promqlPrompt))
+	h.Write([]byte{0})
+	h.Write([]byte(normalized))
+	return hex.EncodeToString(h.Sum(nil))
+}
+
+func (c *promqlCache) get(key string) (string, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	entry, ok := c.entries[key]
+	if !ok {
+		return "", false
+	}
+	if time.Now().After(entry.expires) {
+		delete(c.entries, key)
+		return "", false
+	}
+	return entry.query, true
+}
+
+func (c *promqlCache) put(key, query string) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	now := time.Now()
+	if len(c.entries) >= promqlCacheSize {
+		for k, entry := range c.entries {
+			if now.After(entry.expires) {
+				delete(c.entries, k)
+			}
+		}
+	}
+	if len(c.entries) >= promqlCacheSize {
+		c.entries = map[string]promqlCacheEntry{}
+	}
+	c.entries[key] = promqlCacheEntry{query: query, expires: now.Add(promqlCacheTTL)}
+}
+
 func handlePromql(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 	queryDescription := mcp.ParseString(request, "query_description", "")
 	if queryDescription == "" {
 		return mcp.NewToolResultError("query_description is required"), nil
 	}
 
-	llm, err := openai.New()
+	cacheKey := promqlCacheKey(queryDescription)
+	if cached, ok := promqlResponses.get(cacheKey); ok {
+		return mcp.NewToolResultText(cached), nil
+	}
+
+	llm, err := utils.GetSharedLLM()
 	if err != nil {
 		return mcp.NewToolResultError("failed to create LLM client: " + err.Error()), nil
 	}
 
 	contents := []llms.MessageContent{
-		{
-			Role: llms.ChatMessageTypeSystem,
-			Parts: []llms.ContentPart{
-				llms.TextContent{Text: promqlPrompt},
-			},
-		},
-
+		promqlSystemMessage,
 		{
 			Role: llms.ChatMessageTypeHuman,
 			Parts: []llms.ContentPart{
@@ -39,7 +123,7 @@ func handlePromql(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallTo
 		},
 	}
 
-	resp, err := llm.GenerateContent(ctx, contents, llms.WithModel("gpt-4o-mini"))
+	resp, err := llm.GenerateContent(ctx, contents, llms.WithModel(promqlModel))
 	if err != nil {
 		return mcp.NewToolResultError("failed to generate content: " + err.Error()), nil
 	}
@@ -49,5 +133,6 @@ func handlePromql(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallTo
 		return mcp.NewToolResultError("empty response from model"), nil
 	}
 	c1 := choices[0]
+	promqlResponses.put(cacheKey, c1.Content)
 	return mcp.NewToolResultText(c1.Content), nil
 }
@@ -0,0 +1,64 @@
+package prometheus
+
+import (
+	"context"
+	"regexp"
+	"testing"
+	"time"
+
+	"github.com/mark3labs/mcp-go/mcp"
+	"github.com/stretchr/testify/assert"
+)
+
+func TestPromqlCacheKey(t *testing.T) {
+	assert.Equal(t, promqlCacheKey("CPU usage by  pod"), promqlCacheKey(" CPU usage by pod\n"))
+	// PromQL identifiers are case-sensitive
+	assert.NotEqual(t, promqlCacheKey(`rate of http_requests_total{code="OK"}`), promqlCacheKey(`rate of http_requests_total{code="ok"}`))
+	assert.NotEqual(t, promqlCacheKey("cpu usage by pod"), promqlCacheKey("memory usage by pod"))
+}
+
+func TestHandlePromqlCached(t *testing.T) {
+	key := promqlCacheKey("request rate per service")
+	promqlResponses.put(key, "sum(rate(http_requests_total[5m])) by (service)")
+
+	request := mcp.CallToolRequest{}
+	request.Params.Arguments = map[string]interface{}{
+		"query_description": "request rate  per service",
+	}
+
+	result, err := handlePromql(context.Background(), request)
+	assert.NoError(t, err)
+	assert.False(t, result.IsError)
+	assert.Equal(t, "sum(rate(http_requests_total[5m])) by (service)", result.Content[0].(mcp.TextContent).Text)
+}
+
+func TestPromqlCacheExpiry(t *testing.T) {
+	cache := &promqlCache{entries: map[string]promqlCacheEntry{}}
+	cache.put("live", "up")
+	cache.entries["stale"] = promqlCacheEntry{query: "up", expires: time.Now().Add(-time.Second)}
+
+	query, ok := cache.get("live")
+	assert.True(t, ok)
+	assert.Equal(t, "up", query)
+
+	_, ok = cache.get("stale")
+	assert.False(t, ok)
+	assert.NotContains(t, cache.entries, "stale")
+}
+
+// promptCachingMinTokens is the shortest prompt prefix OpenAI caches
+const promptCachingMinTokens = 1024
+
+// estimatePromptTokens undercounts tokens by treating every word and every punctuation
+// mark as a single token; BPE tokenizers split many of them further.
+func estimatePromptTokens(prompt string) int {
+	return len(regexp.MustCompile(`\w+|[^\w\s]`).FindAllString(prompt, -1))
+}
+
+func TestPromqlPromptCacheable(t *testing.T) {
+	// Trimming the prompt below the caching threshold silently disables prefix caching,
+	// keep a 10% margin over it
+	tokens := estimatePromptTokens(promqlPrompt)
+	assert.GreaterOrEqual(t, tokens, promptCachingMinTokens*11/10,
+		"system prompt is about %d tokens, too close to the %d token caching minimum", tokens, promptCachingMinTokens)
+}
@@ -31,6 +31,17 @@ func (e *DefaultShellExecutor) Exec(ctx context.Context, command string, args ..
 	return cmd.CombinedOutput()
 }
 
+// CommandStarter is implemented by shell executors that can start a long-lived process whose
+// stdin and stdout the caller drives itself
+type CommandStarter interface {
+	Command(command string, args ...string) *exec.Cmd
+}
+
+// Command returns an unstarted os/exec command
+func (e *DefaultShellExecutor) Command(command string, args ...string) *exec.Cmd {
+	return exec.Command(command, args...)
+}
+
 // MockShellExecutor implements ShellExecutor for testing
 type MockShellExecutor struct {
 	// Commands maps command+args to expected output and error
@@ -235,14 +246,35 @@ func RunCommand(command string, args []string) (string, error) {
 
 // RunCommandWithContext executes a command with context and returns output or error with OTEL tracing
 func RunCommandWithContext(ctx context.Context, command string, args []string) (string, error) {
+	ctx, finish := traceCommand(ctx, command, args, 2)
+
+	// Use the shell executor from context (or default)
+	executor := GetShellExecutor(ctx)
+	output, err := executor.Exec(ctx, command, args...)
+	finish(len(output), err)
+
+	if err != nil {
+		return "", fmt.Errorf("command %s failed: %v", command, err)
+	}
+	return strings.TrimSpace(string(output)), nil
+}
+
+// TraceCommand starts the exec span for a command that is not run through RunCommandWithContext
+// (e.g. one piped into a long-lived process) and returns a function that records its outcome in
+// the span, the command metrics and the log.
+func TraceCommand(ctx context.Context, command string, args []string) (context.Context, func(outputSize int, err error)) {
+	return traceCommand(ctx, command, args, 2)
+}
+
+// traceCommand implements TraceCommand; callerSkip selects the stack frame reported as the caller.
+func traceCommand(ctx context.Context, command string, args []string, callerSkip int) (context.Context, func(outputSize int, err error)) {
 	// Get caller information for tracing
-	_, file, line, _ := runtime.Caller(1)
+	_, file, line, _ := runtime.Caller(callerSkip)
 	caller := fmt.Sprintf("%s:%d", file, line)
 
 	// Start OpenTelemetry span
 	spanName := fmt.Sprintf("exec.%s", command)
 	ctx, span := tracer.Start(ctx, spanName)
-	defer span.End()
 
 	// Set span attributes
 	span.SetAttributes(
@@ -254,63 +286,60 @@ func RunCommandWithContext(ctx context.Context, command string, args []string) (
 	// Record metrics
 	startTime := time.Now()
 
-	// Use the shell executor from context (or default)
-	executor := GetShellExecutor(ctx)
-	output, err := executor.Exec(ctx, command, args...)
-
-	duration := time.Since(startTime)
+	return ctx, func(outputSize int, err error) {
+		defer span.End()
+		duration := time.Since(startTime)
 
-	// Set additional span attributes with results
-	span.SetAttributes(
-		attribute.Float64("duration_seconds", duration.Seconds()),
-		attribute.Int("output_size", len(output)),
-	)
-
-	// Record metrics
-	attributes := []attribute.KeyValue{
-		attribute.String("command", command),
-		attribute.Bool("success", err == nil),
-	}
+		// Set additional span attributes with results
+		span.SetAttributes(
+			attribute.Float64("duration_seconds", duration.Seconds()),
+			attribute.Int("output_size", outputSize),
+		)
 
-	if commandExecutionCounter != nil {
-		commandExecutionCounter.Add(ctx, 1, metric.WithAttributes(attributes...))
-	}
+		// Record metrics
+		attributes := []attribute.KeyValue{
+			attribute.String("command", command),
+			attribute.Bool("success", err == nil),
+		}
 
-	if commandExecutionDuration != nil {
-		commandExecutionDuration.Record(ctx, duration.Seconds(), metric.WithAttributes(attributes...))
-	}
+		if commandExecutionCounter != nil {
+			commandExecutionCounter.Add(ctx, 1, metric.WithAttributes(attributes...))
+		}
 
-	if err != nil {
-		// Set span status and record error
-		span.RecordError(err)
-		span.SetStatus(codes.Error, err.Error())
-		span.SetAttributes(attribute.String("error", err.Error()))
+		if commandExecutionDuration != nil {
+			commandExecutionDuration.Record(ctx, duration.Seconds(), metric.WithAttributes(attributes...))
+		}
 
-		if commandExecutionErrors != nil {
-			commandExecutionErrors.Add(ctx, 1, metric.WithAttributes(attributes...))
+		if err != nil {
+			// Set span status and record error
+			span.RecordError(err)
+			span.SetStatus(codes.Error, err.Error())
+			span.SetAttributes(attribute.String("error", err.Error()))
+
+			if commandExecutionErrors != nil {
+				commandExecutionErrors.Add(ctx, 1, metric.WithAttributes(attributes...))
+			}
+
+			logger.Get().Error(err, "CommandExec failed",
+				"command", command,
+				"args", args,
+				"duration", duration,
+				"caller", caller,
+			)
+			return
 		}
 
-		logger.Get().Error(err, "CommandExec failed",
+		// Set successful span status
+		span.SetStatus(codes.Ok, "CommandExec")
+
+		logger.Get().Info("CommandExec",
 			"command", command,
 			"args", args,
 			"duration", duration,
+			"outputSize", outputSize,
 			"caller", caller,
 		)
-		return "", fmt.Errorf("command %s failed: %v", command, err)
 	}
-
-	// Set successful span status
-	span.SetStatus(codes.Ok, "CommandExec")
-
-	logger.Get().Info("CommandExec",
-		"command", command,
-		"args", args,
-		"duration", duration,
-		"outputSize", len(output),
-		"caller", caller,
-	)
-
-	return strings.TrimSpace(string(output)), nil
 }
 
 // shellTool provides shell command execution functionality
@@ -23,6 +23,29 @@ func TestDefaultShellExecutor(t *testing.T) {
 	assert.Empty(t, output)
 }
 
+func TestDefaultShellExecutorCommand(t *testing.T) {
+	var executor ShellExecutor = &DefaultShellExecutor{}
+	starter, ok := executor.(CommandStarter)
+	require.True(t, ok)
+
+	output, err := starter.Command("echo", "hello").Output()
+	assert.NoError(t, err)
+	assert.Equal(t, "hello\n", string(output))
+
+	// The mock runs one-off commands only
+	_, ok = interface{}(NewMockShellExecutor()).(CommandStarter)
+	assert.False(t, ok)
+}
+
+func TestTraceCommand(t *testing.T) {
+	ctx, finish := TraceCommand(context.Background(), "cilium-dbg", []string{"endpoint", "list"})
+	assert.NotNil(t, ctx)
+	finish(10, nil)
+
+	_, finish = TraceCommand(context.Background(), "cilium-dbg", []string{"endpoint", "get", "1"})
+	finish(0, errors.New("exit status 1"))
+}
+
 func TestMockShellExecutor(t *testing.T) {
 	mock := NewMockShellExecutor()
 
@@ -0,0 +1,31 @@
+package utils
+
+import (
+	"sync"
+
+	"github.com/tmc/langchaingo/llms"
+	"github.com/tmc/langchaingo/llms/openai"
+)
+
+var (
+	sharedLLMMu sync.Mutex
+	sharedLLM   llms.Model
+)
+
+// GetSharedLLM returns the process-wide OpenAI client used by the LLM-backed tools,
+// creating it on first use so its HTTP connections are reused across tools and calls.
+// A failed creation is not remembered so a later call can succeed once configured.
+func GetSharedLLM() (llms.Model, error) {
+	sharedLLMMu.Lock()
+	defer sharedLLMMu.Unlock()
+
+	if sharedLLM != nil {
+		return sharedLLM, nil
+	}
+	llm, err := openai.New()
+	if err != nil {
+		return nil, err
+	}
+	sharedLLM = llm
+	return sharedLLM, nil
+}
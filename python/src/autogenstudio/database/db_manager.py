@@ -201,6 +201,63 @@ class DatabaseManager:
             data=model.model_dump() if return_json else model,
         )
 
+    def upsert_many(self, models: list[BaseDBModel], return_json: Optional[bool] = True) -> Response:
+        """Create or update several entities of the same type in a single transaction
+
+        Args:
+            models (list[SQLModel]): The model instances to create or update
+            return_json (bool, optional): If True, returns the models as dictionaries.
+                If False, returns the SQLModel instances. If None, returns no data and
+                skips reloading the rows after the commit. Defaults to True.
+
+        Returns:
+            Response: Contains status, message and data (list of dicts or SQLModels based on return_json)
+        """
+        if not models:
+            return Response(message="Nothing to update", status=True, data=[])
+
+        status = True
+        model_class = type(models[0])
+        results = []
+
+        with Session(self.engine) as session:
+            try:
+                ids = [model.id for model in models if model.id is not None]
+                existing_models = {}
+                if ids:
+                    statement = select(model_class).where(model_class.id.in_(ids))  # type: ignore
+                    existing_models = {m.id: m for m in session.exec(statement).all()}
+
+                for model in models:
+                    existing_model = existing_models.get(model.id)
+                    if existing_model:
+                        model.updated_at = datetime.now()
+                        for key, value in model.model_dump().items():
+                            setattr(existing_model, key, value)
+                        model = existing_model
+                    session.add(model)
+                    results.append(model)
+                session.commit()
+                if return_json is None:
+                    # Caller does not need the rows back, avoid reloading each one
+                    results = []
+                for model in results:
+                    session.refresh(model)
+            except Exception as e:
+                session.rollback()
+                logger.error("Error while updating/creating " + str(model_class.__name__) + ": " + str(e))
+                status = False
+
+            return Response(
+                message=(
+                    f"{model_class.__name__} Batch Updated Successfully"
+                    if status
+                    else f"Error while updating/creating {model_class.__name__}"
+                ),
+                status=status,
+                data=[model.model_dump() if return_json else model for model in results] if status else [],
+            )
+
     def _model_to_dict(self, model_obj):
         return {col.name: getattr(model_obj, col.name) for col in model_obj.__table__.columns}
 
@@ -1,4 +1,5 @@
-from typing import Dict
+import asyncio
+from typing import Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 
@@ -73,10 +74,24 @@ async def get_server_tools(server_id: int, user_id: str, db=Depends(get_db)) ->
     if not server_response.status or not server_response.data:
         raise HTTPException(status_code=404, detail="Server not found")
 
-    tools_response = db.get(Tool, filters={"server_id": server_id, "user_id": user_id})
+    # Rows are returned as plain column dicts, they need no model serialization in the response
+    tools_response = db.get(Tool, filters={"server_id": server_id, "user_id": user_id}, return_json=True)
     return {"status": True, "data": tools_response.data}
 
 
+def _get_tool_name(component: Dict) -> Optional[str]:
+    """Return the tool name from a serialized tool component, if any"""
+    try:
+        return component.get("config", {}).get("tool", {}).get("name")
+    except AttributeError:
+        return None
+
+
+def _dump_tool_component(tool_component) -> Dict:
+    """Serialize a discovered tool component to a dict"""
+    return tool_component.dump_component().model_dump()
+
+
 @router.post("/{server_id}/refresh")
 async def refresh_server_tools(server_id: int, user_id: str, db=Depends(get_db)) -> Dict:
     """Refresh tools for an existing server"""
@@ -92,52 +107,51 @@ async def refresh_server_tools(server_id: int, user_id: str, db=Depends(get_db))
         # Use the same discovery logic as the tools endpoint
         tools_components = await tsm.discover_tools(server.component)
 
+        # Start serializing the discovered components in worker threads, the database
+        # work below stays on this thread (SQLite connections are bound to their thread)
+        loop = asyncio.get_running_loop()
+        dump_futures = [
+            loop.run_in_executor(None, _dump_tool_component, tool_component) for tool_component in tools_components
+        ]
+
         # Update server last_connected timestamp
         from datetime import datetime
 
         server.last_connected = datetime.now()
         db.upsert(server)
 
-        updated_count = 0
-        created_count = 0
-
-        for tool_component in tools_components:
-            # Generate a unique identifier for the tool from its component
-            component_data = tool_component.dump_component().model_dump()
-
-            # Check if the tool already exists based on id/name
-            component_config = component_data.get("config", {})
-            tool_config = component_config.get("tool", {})
-            tool_name = tool_config.get("name", None)
-
-            # First get all tools for this server and user
-            existing_tool_response = db.get(Tool, filters={"server_id": server_id, "user_id": user_id})
+        # Fetch the existing tools once and index them by name
+        existing_tool_response = db.get(Tool, filters={"server_id": server_id, "user_id": user_id})
+        existing_tools = {}
+        if existing_tool_response.status and existing_tool_response.data:
+            for tool in existing_tool_response.data:
+                existing_tools.setdefault(_get_tool_name(tool.component), tool)
 
-            matching_tools = []
-            if existing_tool_response.status and existing_tool_response.data:
-                for tool in existing_tool_response.data:
-                    try:
-                        tool_comp = tool.component
-                        if tool_comp.get("config", {}).get("tool", {}).get("name") == tool_name:
-                            matching_tools.append(tool)
-                    except Exception:
-                        pass
+        components_data = await asyncio.gather(*dump_futures)
 
-            # Update existing_tool_response to use our filtered results
-            existing_tool_response.data = matching_tools
+        updated_count = 0
+        created_count = 0
+        to_upsert = {}
 
-            if existing_tool_response.status and existing_tool_response.data:
+        for component_data in components_data:
+            # Check if the tool already exists based on its name
+            tool_name = _get_tool_name(component_data)
+            existing_tool = existing_tools.get(tool_name)
+            if existing_tool:
                 # Tool exists, update it
-                existing_tool = existing_tool_response.data[0]
                 existing_tool.component = component_data
-                db.upsert(existing_tool)
                 updated_count += 1
             else:
                 # Tool does not exist, create new
-                new_tool = Tool(user_id=user_id, server_id=server_id, component=component_data)
-                # print(f"Creating new tool: {new_tool}")
-                db.upsert(new_tool)
+                existing_tool = Tool(user_id=user_id, server_id=server_id, component=component_data)
+                existing_tools[tool_name] = existing_tool
                 created_count += 1
+            to_upsert[tool_name] = existing_tool
+
+        # Write all created/updated tools in a single transaction
+        upsert_response = db.upsert_many(list(to_upsert.values()), return_json=None)
+        if not upsert_response.status:
+            raise Exception(upsert_response.message)
 
         return {
             "status": True,
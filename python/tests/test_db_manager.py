@@ -0,0 +1,166 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel
+
+from autogenstudio.database import DatabaseManager
+from autogenstudio.datamodel import Tool, ToolServer
+from autogenstudio.web.routes import tool_servers
+
+
+def tool_component(name, description=""):
+    return {
+        "provider": "test.Tool",
+        "component_type": "tool",
+        "config": {"tool": {"name": name, "description": description}},
+    }
+
+
+@pytest.fixture
+def db():
+    # In-memory SQLite keeps one connection per thread, so the tables live as long as the engine
+    db = DatabaseManager("sqlite://")
+    SQLModel.metadata.create_all(db.engine)
+    yield db
+    db.engine.dispose()
+
+
+@pytest.fixture
+def server(db):
+    response = db.upsert(ToolServer(user_id="user", component={"config": {}}), return_json=False)
+    assert response.status
+    return response.data
+
+
+def create_tool(db, server_id, name):
+    response = db.upsert(Tool(user_id="user", server_id=server_id, component=tool_component(name)), return_json=False)
+    assert response.status
+    return response.data
+
+
+@contextmanager
+def count_statements(db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+
+def tool_names(db, server_id):
+    response = db.get(Tool, filters={"server_id": server_id, "user_id": "user"})
+    return sorted(tool.component["config"]["tool"]["name"] for tool in response.data)
+
+
+def test_upsert_many_creates_and_updates(db, server):
+    existing_tool = create_tool(db, server.id, "get_pods")
+
+    existing_tool.component = tool_component("get_pods", "updated")
+    new_tool = Tool(user_id="user", server_id=server.id, component=tool_component("get_logs"))
+
+    response = db.upsert_many([existing_tool, new_tool], return_json=False)
+
+    assert response.status
+    assert len(response.data) == 2
+    assert response.data[0].id == existing_tool.id
+    assert response.data[1].id is not None
+    assert tool_names(db, server.id) == ["get_logs", "get_pods"]
+
+    stored = db.get(Tool, filters={"id": existing_tool.id}).data[0]
+    assert stored.component["config"]["tool"]["description"] == "updated"
+
+
+def upsert_batch_statements(db, server_id, size):
+    existing_tools = [create_tool(db, server_id, f"existing_{size}_{i}") for i in range(size)]
+    for tool in existing_tools:
+        tool.component = tool_component(tool.component["config"]["tool"]["name"], "updated")
+    new_tools = [
+        Tool(user_id="user", server_id=server_id, component=tool_component(f"new_{size}_{i}")) for i in range(size)
+    ]
+
+    with count_statements(db) as statements:
+        response = db.upsert_many(existing_tools + new_tools, return_json=None)
+
+    assert response.status
+    assert response.data == []
+    return statements
+
+
+def test_upsert_many_statement_count(db, server):
+    small = upsert_batch_statements(db, server.id, 2)
+    large = upsert_batch_statements(db, server.id, 20)
+
+    # One lookup plus the batched writes, independent of the number of rows
+    assert len(large) == len(small)
+    assert not any(statement.lstrip().upper().startswith("SELECT") for statement in small[1:])
+    assert len(tool_names(db, server.id)) == 44
+
+
+def test_upsert_many_empty(db):
+    response = db.upsert_many([])
+
+    assert response.status
+    assert response.data == []
+
+
+def test_upsert_many_rolls_back_on_error(db, server):
+    existing_tool = create_tool(db, server.id, "get_pods")
+
+    existing_tool.component = tool_component("get_pods", "updated")
+    new_tool = Tool(user_id="user", server_id=server.id, component=tool_component("get_logs"))
+    # Not JSON serializable, fails the whole batch at commit time
+    broken_tool = Tool(user_id="user", server_id=server.id, component={"config": {"tool": {"name": object()}}})
+
+    response = db.upsert_many([existing_tool, new_tool, broken_tool])
+
+    assert not response.status
+    assert response.data == []
+    assert tool_names(db, server.id) == ["get_pods"]
+    stored = db.get(Tool, filters={"id": existing_tool.id}).data[0]
+    assert stored.component["config"]["tool"]["description"] == ""
+
+
+class FakeComponent:
+    def __init__(self, component):
+        self.component = component
+
+    def dump_component(self):
+        return self
+
+    def model_dump(self):
+        return self.component
+
+
+async def test_refresh_server_tools_counts(db, server, monkeypatch):
+    create_tool(db, server.id, "get_pods")
+
+    async def discover_tools(self, tool_server_config):
+        return [
+            FakeComponent(tool_component("get_pods", "updated")),
+            FakeComponent(tool_component("get_logs")),
+            FakeComponent(tool_component("get_events")),
+        ]
+
+    monkeypatch.setattr(tool_servers.ToolServerManager, "discover_tools", discover_tools)
+
+    with count_statements(db) as statements:
+        response = await tool_servers.refresh_server_tools(server.id, "user", db=db)
+
+    assert response["status"]
+    assert response["data"] == {"total_count": 3, "updated_count": 1, "created_count": 2}
+    assert tool_names(db, server.id) == ["get_events", "get_logs", "get_pods"]
+    # The written tools are not reloaded one by one
+    selects = [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+    assert not any("FROM tool WHERE tool.id =" in " ".join(statement.split()) for statement in selects)
+
+    # Refreshing again only updates
+    response = await tool_servers.refresh_server_tools(server.id, "user", db=db)
+
+    assert response["data"] == {"total_count": 3, "updated_count": 3, "created_count": 0}
+    assert tool_names(db, server.id) == ["get_events", "get_logs", "get_pods"]